@@ -3,20 +3,34 @@ Base Agent Class
 All agents follow the Sense → Decide → Act loop
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+import copy
 import logging
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from services.metrics import metrics
+from services.logging_config import agent_logger, CycleSampler
 
 class BaseAgent(ABC):
     """
     Abstract base class for all autonomous agents
     """
+    # Keys this agent reads from other agents' results (see AgentPipeline);
+    # everything else comes from the floor environment
+    inputs: Tuple[str, ...] = ()
+    # Keys this agent publishes for others: published name -> key of its result
+    outputs: Dict[str, str] = {}
+
     def __init__(self, name: str):
         self.name = name
         self.state: Dict[str, Any] = {}
-        logger.info(f"Agent '{self.name}' initialized")
+        # Milliseconds per phase of the latest run (when metrics are enabled)
+        self.last_timings: Dict[str, float] = {}
+        # "agents.<name>", so each agent's level can be set on its own
+        self.logger = agent_logger(name)
+        # Whether this run logs its per-cycle messages (see LOG_CYCLE_SAMPLE)
+        self.log_cycle = True
+        self._sample_cycle = CycleSampler()
+        self.logger.debug("Agent '%s' initialized", self.name)
 
     @abstractmethod
     def sense(self, environment: Dict[str, Any]) -> Dict[str, Any]:
@@ -39,13 +53,51 @@ class BaseAgent(ABC):
         """
         pass
 
-    def run(self, environment: Dict[str, Any]) -> Any:
+    def sense_delta(self, environment: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sense incrementally: update the cached perception for only the
+        tables and queue entries in delta. Return None to fall back to a
+        full sense (the default for agents without a cache).
+        """
+        return None
+
+    def run(self, environment: Dict[str, Any], delta: Optional[Dict[str, Any]] = None) -> Any:
         """
         Execute the full Sense → Decide → Act loop
+
+        delta, when given, lists what changed since the previous cycle
+        (see FloorState.take_delta) so agents can update incrementally.
         """
-        logger.info(f"Agent '{self.name}' starting execution cycle")
-        perception = self.sense(environment)
+        self.log_cycle = self._sample_cycle() and self.logger.isEnabledFor(logging.INFO)
+        self.logger.debug("Agent '%s' starting execution cycle", self.name)
+        timer = metrics.phase_timer(self.name)
+        perception = None
+        if delta is not None and not delta.get("full"):
+            perception = self.sense_delta(environment, delta)
+        if perception is None:
+            perception = self.sense(environment)
+        if timer:
+            timer.lap("sense")
         decision = self.decide(perception)
+        if timer:
+            timer.lap("decide")
         result = self.act(decision)
-        logger.info(f"Agent '{self.name}' completed execution cycle")
+        if timer:
+            timer.lap("act")
+            self.last_timings = timer.finish()
+        self.logger.debug("Agent '%s' completed execution cycle", self.name)
         return result
+
+    def dry_run(self, environment: Dict[str, Any]) -> Any:
+        """
+        Sense → Decide → Act from the full environment on a scratch copy
+        of the agent, for read-only analysis
+
+        The agent's own state, adaptive settings, timings, log sampling
+        and metrics are left as the last cycle left them, so a dry run
+        is safe to make from another thread while a cycle is running.
+        """
+        scratch = copy.copy(self)
+        scratch.state = {}
+        scratch.log_cycle = False
+        return scratch.act(scratch.decide(scratch.sense(environment)))
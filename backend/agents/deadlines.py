@@ -0,0 +1,73 @@
+"""
+Occupancy Deadlines - Min-heap of the moments occupied tables turn stale
+"""
+import heapq
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class DeadlineHeap:
+    """
+    One deadline per key, earliest first.
+
+    Rescheduling or cancelling a key leaves its old heap entry behind; it
+    is recognised as outdated and dropped when it reaches the top. Every
+    change is therefore a dict update plus at most one O(log n) push, and
+    popping what is due touches only the expired entries. The heap is
+    rebuilt when outdated entries outnumber live ones.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, Hashable]] = []
+        self._deadlines: Dict[Hashable, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def get(self, key: Hashable) -> Optional[datetime]:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: Hashable, deadline: datetime) -> bool:
+        """
+        Set key's deadline. Returns True when it became the earliest one.
+        """
+        if self._deadlines.get(key) == deadline:
+            return False
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        self._compact()
+        return self.next_deadline() == deadline
+
+    def cancel(self, key: Hashable) -> None:
+        if self._deadlines.pop(key, None) is not None:
+            self._compact()
+
+    def next_deadline(self) -> Optional[datetime]:
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: datetime) -> List[Hashable]:
+        """
+        Remove and return the keys whose deadline is at or before now
+        """
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    def rebuild(self, deadlines: Dict[Hashable, datetime]) -> None:
+        """
+        Replace every deadline at once, in O(n)
+        """
+        self._deadlines = dict(deadlines)
+        self._heap = [(deadline, key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self.rebuild(self._deadlines)
@@ -2,11 +2,11 @@
 ETA Agent - Predicts waiting times dynamically
 """
 from agents.base_agent import BaseAgent
-from typing import Dict, Any
+from agents.eta_model import TurnoverModel, DrainSimulation, group_occupied, occupancy_order
+from models.models import queue_order
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-import logging
-
-logger = logging.getLogger(__name__)
+from itertools import islice
 
 class ETAAgent(BaseAgent):
     """
@@ -14,30 +14,138 @@ class ETAAgent(BaseAgent):
     - Calculating estimated wait times
     - Predicting table turnover
     - Updating ETAs dynamically
+
+    ETAs come from a TurnoverModel that learns per-capacity dining times
+    from recorded occupied -> available transitions.
     """
+    # Parties the Queue Agent matched this cycle are being seated (ETA 0),
+    # and their tables are not free for anyone else
+    inputs = ("queue_matches",)
+    outputs = {"eta_updates": "eta_updates"}
+    
+    DEFAULT_DINING_TIME = 45  # minutes, prior until turnover history exists
     
     def __init__(self):
         super().__init__("ETAAgent")
-        self.avg_dining_time = 45  # minutes
-        self.base_wait_increment = 15  # minutes per position
+        self.avg_dining_time = self.DEFAULT_DINING_TIME
+        self.base_wait_increment = 15  # minutes per position, for parties no table fits
+        self.min_quote = 5  # minutes, time to get a party to a free table
+        self.model = TurnoverModel(default_dining_time=self.avg_dining_time)
+
+    @staticmethod
+    def _matched(environment: Dict[str, Any]) -> Tuple[Set[int], Set[int]]:
+        """
+        Table ids and queue entry ids of this cycle's matches
+        """
+        matches = environment.get("queue_matches") or []
+        return ({match["table_id"] for match in matches},
+                {match["queue_entry_id"] for match in matches})
+
+    @classmethod
+    def _available_tables(cls, environment: Dict[str, Any]) -> List[Any]:
+        available_tables = environment.get("available_tables", [])
+        matched_table_ids, _ = cls._matched(environment)
+        if not matched_table_ids:
+            return available_tables
+        return [t for t in available_tables if t.id not in matched_table_ids]
+
+    @classmethod
+    def _split_queue(cls, environment: Dict[str, Any], queue: List[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        Split the queue into the parties still waiting, which drain against
+        the floor, and the ones matched to a table this cycle
+        """
+        _, matched_entry_ids = cls._matched(environment)
+        if not matched_entry_ids:
+            return queue, []
+        return ([e for e in queue if e.id not in matched_entry_ids],
+                [e for e in queue if e.id in matched_entry_ids])
 
     def sense(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sense: Gather queue and table information
         """
-        queue = environment.get("queue", [])
+        waiting, matched = self._split_queue(environment, environment.get("queue", []))
         occupied_tables = environment.get("occupied_tables", [])
-        available_tables = environment.get("available_tables", [])
+        available_tables = self._available_tables(environment)
+        
+        # Occupied tables per capacity, longest-occupied first
+        self.state["occupied"] = {
+            capacity: {table.id: table for table in tables}
+            for capacity, tables in group_occupied(occupied_tables).items()
+        }
         
         perception = {
-            "queue_entries": sorted(queue, key=lambda x: x.position),
-            "occupied_tables": occupied_tables,
+            "queue_entries": sorted(waiting, key=queue_order),
+            "matched_entries": matched,
+            "occupied_by_capacity": self.state["occupied"],
+            "available_tables": available_tables,
             "available_count": len(available_tables),
+            "simulation": None,
             "current_time": datetime.utcnow()
         }
         
         return perception
 
+    def sense_delta(self, environment: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sense incrementally. When the only change is parties joining at the
+        back of the queue, continue the previous drain simulation for just
+        those parties; otherwise move the changed tables between the cached
+        per-capacity buckets and simulate the queue again.
+        """
+        occupied = self.state.get("occupied")
+        if occupied is None:
+            return None
+        
+        current_time = datetime.utcnow()
+        simulation = self.state.get("simulation")
+        new_entries = sorted(delta["queue"].values(), key=queue_order)
+        last_order = self.state.get("last_order")
+        _, matched_entry_ids = self._matched(environment)
+        # A table handed to a new arrival this cycle changes the floor for
+        # everyone ahead of it too, so that also needs a fresh simulation
+        appended = (
+            simulation is not None
+            and matched_entry_ids == self.state["matched_ids"]
+            and len(self._available_tables(environment)) == self.state["available_count"]
+            and not delta["tables"]
+            and not delta["removed_queue"]
+            and not any(e.id in self.state["simulated_ids"]
+                        or (last_order is not None and queue_order(e) <= last_order)
+                        for e in new_entries)
+        )
+        if appended:
+            return {
+                "queue_entries": new_entries,
+                "matched_entries": [],
+                "simulation": simulation,
+                "current_time": current_time
+            }
+        
+        for table in delta["tables"].values():
+            for bucket in occupied.values():
+                bucket.pop(table.id, None)
+            if table.status == "occupied":
+                bucket = occupied.setdefault(table.capacity, {})
+                bucket[table.id] = table
+                # New occupancies append in time order; anything else re-sorts
+                tail = [occupancy_order(t) for t in islice(reversed(bucket.values()), 2)]
+                if tail != sorted(tail, reverse=True):
+                    occupied[table.capacity] = dict(sorted(bucket.items(), key=lambda item: occupancy_order(item[1])))
+        
+        available_tables = self._available_tables(environment)
+        waiting, matched = self._split_queue(environment, environment.get("queue", []))
+        return {
+            "queue_entries": waiting,
+            "matched_entries": matched,
+            "occupied_by_capacity": occupied,
+            "available_tables": available_tables,
+            "available_count": len(available_tables),
+            "simulation": None,
+            "current_time": current_time
+        }
+
     def decide(self, perception: Dict[str, Any]) -> Dict[str, Any]:
         """
         Decide: Calculate ETAs for each queue entry
@@ -47,35 +155,54 @@ class ETAAgent(BaseAgent):
         }
         
         queue_entries = perception["queue_entries"]
-        available_count = perception["available_count"]
-        occupied_tables = perception["occupied_tables"]
+        current_time = perception["current_time"]
         
-        # Calculate average remaining dining time for occupied tables
-        avg_remaining_time = self.avg_dining_time / 2  # Simple heuristic
+        # Simulate the queue draining against predicted table free-up times
+        simulation = perception["simulation"]
+        if simulation is None:
+            simulation = DrainSimulation(
+                self.model,
+                perception["available_tables"],
+                {capacity: bucket.values() for capacity, bucket in perception["occupied_by_capacity"].items()},
+                current_time
+            )
+            self.state["simulation"] = simulation
+            self.state["simulated_ids"] = set()
+            self.state["last_order"] = None
+            self.state["available_count"] = perception["available_count"]
+            self.state["matched_ids"] = {entry.id for entry in perception["matched_entries"]}
+        
+        # Matched parties are being seated now
+        for entry in perception["matched_entries"]:
+            decisions["eta_updates"].append({
+                "queue_entry_id": entry.id,
+                "estimated_wait_time": 0,
+                "customer_name": entry.name
+            })
+        
+        # Continued simulations are measured from when they started
+        elapsed = (current_time - simulation.started_at).total_seconds() / 60
         
         for entry in queue_entries:
-            # Base calculation: position * increment
-            base_eta = entry.position * self.base_wait_increment
-            
-            # Adjust based on available tables
-            if available_count > 0:
-                # If tables are available, reduce wait time
-                eta = min(5, base_eta)  # Immediate seating
+            eta = simulation.seat(entry)
+            if eta is None:
+                # No table on the floor fits this party: fall back to its
+                # place in line (everyone simulated so far is ahead of it)
+                eta = (len(self.state["simulated_ids"]) + 1) * self.base_wait_increment
             else:
-                # If no tables available, factor in turnover
-                eta = base_eta
-                
-                # If there are occupied tables, reduce ETA slightly
-                if occupied_tables:
-                    eta = max(10, eta - 5)
+                eta -= elapsed
+            eta = max(self.min_quote, round(eta))
             
             decisions["eta_updates"].append({
                 "queue_entry_id": entry.id,
                 "estimated_wait_time": int(eta),
                 "customer_name": entry.name
             })
+            self.state["simulated_ids"].add(entry.id)
+            self.state["last_order"] = queue_order(entry)
         
-        logger.info(f"ETAAgent calculated ETAs for {len(decisions['eta_updates'])} customers")
+        if self.log_cycle:
+            self.logger.info("calculated ETAs for %d customers", len(decisions["eta_updates"]))
         
         return decisions
 
@@ -0,0 +1,185 @@
+"""
+ETA Model - Dining-time statistics learned from table turnover
+"""
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+import heapq
+import math
+
+class RunningStats:
+    """
+    Incrementally maintained count / mean / variance (Welford)
+    """
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, variance: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = variance * count
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count > 1 else 0.0
+
+class TurnoverModel:
+    """
+    Per-capacity dining-time distributions and a queue-drain simulation
+    built on them.
+
+    Each table capacity keeps running statistics of observed dining times.
+    Until a capacity has enough history its mean is blended with
+    default_dining_time, so a new floor starts from the old fixed guess.
+    """
+
+    def __init__(self, default_dining_time: float = 45.0, prior_weight: int = 5,
+                 min_remaining: float = 2.0):
+        self.default_dining_time = default_dining_time
+        self.prior_weight = prior_weight
+        self.min_remaining = min_remaining
+        self.stats: Dict[int, RunningStats] = {}
+
+    def observe(self, capacity: int, duration_minutes: float) -> None:
+        """
+        Record one completed occupancy (occupied -> freed)
+        """
+        self.stats.setdefault(capacity, RunningStats()).observe(duration_minutes)
+
+    def load(self, aggregates: Iterable[Tuple[int, int, float, float]]) -> None:
+        """
+        Replace the statistics with (capacity, count, mean, mean_of_squares)
+        aggregates computed by the database
+        """
+        self.stats = {}
+        for capacity, count, mean, mean_sq in aggregates:
+            if not count:
+                continue
+            variance = max((mean_sq or 0.0) - mean * mean, 0.0)
+            self.stats[capacity] = RunningStats(count, mean, variance)
+
+    def dining_time(self, capacity: int) -> Tuple[float, float]:
+        """
+        Expected dining time and its standard deviation for a capacity
+        """
+        stats = self.stats.get(capacity)
+        k = self.prior_weight
+        if stats is None or stats.count == 0:
+            return self.default_dining_time, self.default_dining_time / 3
+        
+        mean = (stats.count * stats.mean + k * self.default_dining_time) / (stats.count + k)
+        std = math.sqrt(stats.variance) if stats.count > 1 else mean / 3
+        return mean, max(std, 1.0)
+
+    def remaining_time(self, capacity: int, elapsed_minutes: float) -> float:
+        """
+        Expected minutes until a table that has been occupied for
+        elapsed_minutes frees up: E[X - e | X > e] under a normal fit
+        """
+        mean, std = self.dining_time(capacity)
+        a = (elapsed_minutes - mean) / std
+        tail = 0.5 * math.erfc(a / math.sqrt(2))
+        if tail < 1e-9:
+            # Far past the distribution: the party is about to leave
+            return self.min_remaining
+        pdf = math.exp(-0.5 * a * a) / math.sqrt(2 * math.pi)
+        expected_total = mean + std * pdf / tail
+        return max(expected_total - elapsed_minutes, self.min_remaining)
+
+    def simulate(self, queue_entries: List[Any], available_tables: List[Any],
+                 occupied_tables: List[Any], now: datetime) -> Dict[int, Optional[float]]:
+        """
+        Drain the queue (in order) against predicted table free-up times.
+        Returns minutes until seating per queue entry id (None if no table
+        can ever fit the party).
+        """
+        simulation = DrainSimulation(self, available_tables, group_occupied(occupied_tables), now)
+        return {entry.id: simulation.seat(entry) for entry in queue_entries}
+
+def occupancy_order(table: Any) -> datetime:
+    """
+    Sort key putting the longest-occupied (soonest to free up) table first
+    """
+    return table.occupied_since or datetime.max
+
+def group_occupied(occupied_tables: Iterable[Any]) -> Dict[int, List[Any]]:
+    """
+    Group occupied tables by capacity, longest-occupied first
+    """
+    groups: Dict[int, List[Any]] = {}
+    for table in occupied_tables:
+        groups.setdefault(table.capacity, []).append(table)
+    for group in groups.values():
+        group.sort(key=occupancy_order)
+    return groups
+
+class DrainSimulation:
+    """
+    Queue-drain simulation: each party takes the earliest-freeing table
+    that fits it, and that table frees again one expected dining time later.
+
+    Expected remaining time only shrinks the longer a table has been
+    occupied, so within a capacity the longest-occupied table always frees
+    first. Occupied tables are therefore consumed lazily, oldest first,
+    and a simulation only ever evaluates as many tables as it seats
+    parties. Keeping the state lets later arrivals at the back of the
+    queue continue the simulation instead of replaying it.
+    """
+
+    def __init__(self, model: TurnoverModel, available_tables: Iterable[Any],
+                 occupied_by_capacity: Dict[int, Iterable[Any]], now: datetime):
+        self.model = model
+        self.started_at = now
+        # Per-capacity min-heaps of free-up times (minutes from started_at)
+        self.free_at: Dict[int, List[float]] = {}
+        for table in available_tables:
+            self.free_at.setdefault(table.capacity, []).append(0.0)
+        # Occupied tables not yet pulled into the heaps, oldest first
+        self._pending: Dict[int, Iterator[Any]] = {}
+        self._next_pending: Dict[int, float] = {}
+        for capacity, tables in occupied_by_capacity.items():
+            self._pending[capacity] = iter(tables)
+            self._advance(capacity)
+        
+        self.capacities = sorted(set(self.free_at) | set(self._next_pending))
+        self.dining = {capacity: model.dining_time(capacity)[0] for capacity in self.capacities}
+
+    def _advance(self, capacity: int) -> None:
+        table = next(self._pending[capacity], None)
+        if table is None:
+            self._next_pending.pop(capacity, None)
+            return
+        elapsed = (self.started_at - table.occupied_since).total_seconds() / 60 if table.occupied_since else 0.0
+        self._next_pending[capacity] = self.model.remaining_time(capacity, elapsed)
+
+    def _earliest(self, capacity: int) -> float:
+        heap = self.free_at.get(capacity)
+        earliest = heap[0] if heap else math.inf
+        return min(earliest, self._next_pending.get(capacity, math.inf))
+
+    def seat(self, entry: Any) -> Optional[float]:
+        """
+        Seat the next party in queue order and return its wait in minutes
+        """
+        best_capacity, best_time = None, math.inf
+        for capacity in self.capacities[bisect_left(self.capacities, entry.party_size):]:
+            earliest = self._earliest(capacity)
+            if earliest < best_time:
+                best_capacity, best_time = capacity, earliest
+        
+        if best_capacity is None:
+            return None
+        
+        heap = self.free_at.setdefault(best_capacity, [])
+        if heap and heap[0] <= best_time:
+            heapq.heappop(heap)
+        else:
+            self._advance(best_capacity)
+        heapq.heappush(heap, best_time + self.dining[best_capacity])
+        return best_time
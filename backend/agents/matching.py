@@ -0,0 +1,145 @@
+"""
+Table Matching - Capacity-indexed best-fit matcher for the Queue Agent
+"""
+from bisect import bisect_left
+from collections import deque
+from importlib.util import find_spec
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence
+
+# Optimal mode is optional (callers fall back to greedy). numpy and scipy
+# take longer to import than the rest of the app, so they are only looked
+# up here and imported on first use.
+OPTIMAL_MATCHING_AVAILABLE = find_spec("numpy") is not None and find_spec("scipy") is not None
+
+# Cost assigned to party/table pairs that cannot be used
+_INFEASIBLE = 1e9
+
+class BestFitMatcher:
+    """
+    Hands out the smallest available table that fits a party.
+
+    Tables are bucketed by capacity (keeping their original order inside
+    each bucket) and the distinct capacities are kept sorted, so each
+    lookup is a bisect plus a popleft instead of a scan over every table.
+    """
+
+    def __init__(self, tables: Iterable[Any]):
+        self._buckets: Dict[int, Deque[Any]] = {}
+        for table in tables:
+            self._buckets.setdefault(table.capacity, deque()).append(table)
+        self._capacities: List[int] = sorted(self._buckets)
+        self._remaining = sum(len(bucket) for bucket in self._buckets.values())
+
+    def __len__(self) -> int:
+        return self._remaining
+
+    def take(self, party_size: int) -> Optional[Any]:
+        """
+        Remove and return the best-fitting table for party_size, or None
+        """
+        idx = bisect_left(self._capacities, party_size)
+        if idx == len(self._capacities):
+            return None
+        
+        capacity = self._capacities[idx]
+        bucket = self._buckets[capacity]
+        table = bucket.popleft()
+        if not bucket:
+            # Distinct capacities are few, so dropping one is cheap
+            del self._buckets[capacity]
+            del self._capacities[idx]
+        self._remaining -= 1
+        return table
+
+def match_best_fit(queue_entries: Iterable[Any], tables: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    First-come best-fit matching: walk the queue in order and give each
+    party the smallest remaining table that fits it.
+    Returns a list of {"entry": ..., "table": ...} pairs.
+    """
+    matcher = BestFitMatcher(tables)
+    pairs = []
+    
+    for entry in queue_entries:
+        if not matcher:
+            break
+        table = matcher.take(entry.party_size)
+        if table is not None:
+            pairs.append({"entry": entry, "table": table})
+    
+    return pairs
+
+def match_optimal(queue_entries: Sequence[Any], tables: Sequence[Any],
+                  fairness_weight: float = 0.5, max_batch: int = 200) -> List[Dict[str, Any]]:
+    """
+    Batch matching: solve the front of the queue against every available
+    table as one weighted bipartite assignment.
+
+    Leaving a party unseated costs more than any amount of wasted seats
+    (so the solver fills as many seats as possible), and earlier parties
+    cost more to skip (fairness_weight per place in the queue). Parties
+    beyond the first max_batch are matched best-fit against whatever
+    tables the solver left over, which bounds the matrix size per cycle.
+    Returns {"entry": ..., "table": ...} pairs in queue order.
+    """
+    if not OPTIMAL_MATCHING_AVAILABLE:
+        raise RuntimeError("optimal matching requires numpy and scipy")
+    import numpy as np
+    from scipy.optimize import linear_sum_assignment
+    
+    tables = list(tables)
+    batch = list(queue_entries[:max_batch])
+    if not batch or not tables:
+        return []
+    
+    sizes = np.fromiter((e.party_size for e in batch), dtype=float, count=len(batch))
+    capacities = np.fromiter((t.capacity for t in tables), dtype=float, count=len(tables))
+    
+    # Seating cost: empty seats left at the table
+    waste = capacities[None, :] - sizes[:, None]
+    seat_cost = np.where(waste >= 0, waste, _INFEASIBLE)
+    
+    # "Stay in queue" option per party: one dummy column each
+    skip_penalty = capacities.max() + 1
+    ranks = np.arange(len(batch), dtype=float)
+    skip_cost = sizes * skip_penalty + fairness_weight * (len(batch) - ranks)
+    dummy = np.full((len(batch), len(batch)), _INFEASIBLE)
+    np.fill_diagonal(dummy, skip_cost)
+    
+    # Row indices come back sorted, so pairs stay in queue order
+    rows, cols = linear_sum_assignment(np.hstack([seat_cost, dummy]))
+    
+    pairs = []
+    used_tables = set()
+    for row, col in zip(rows, cols):
+        if col < len(tables) and seat_cost[row, col] < _INFEASIBLE:
+            pairs.append({"entry": batch[row], "table": tables[col]})
+            used_tables.add(col)
+    
+    # Overflow beyond the solved batch: best-fit on the leftover tables
+    leftover = [t for i, t in enumerate(tables) if i not in used_tables]
+    if len(queue_entries) > max_batch and leftover:
+        pairs.extend(match_best_fit(queue_entries[max_batch:], leftover))
+    
+    return pairs
+
+def seat_utilisation(pairs: Iterable[Dict[str, Any]], tables: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Summarise how well a set of matches uses the available seats
+    """
+    total_seats = sum(t.capacity for t in tables)
+    seated_guests = 0
+    assigned_seats = 0
+    matches = 0
+    for pair in pairs:
+        seated_guests += pair["entry"].party_size
+        assigned_seats += pair["table"].capacity
+        matches += 1
+    
+    return {
+        "matches": matches,
+        "seated_guests": seated_guests,
+        "available_seats": total_seats,
+        "wasted_seats": assigned_seats - seated_guests,
+        "seat_utilisation": round(seated_guests / total_seats, 4) if total_seats else 0.0
+    }
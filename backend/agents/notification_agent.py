@@ -2,11 +2,9 @@
 Notification Agent - Handles communications with customers and staff
 """
 from agents.base_agent import BaseAgent
-from typing import Dict, Any, List
+from typing import Dict, Any
 import logging
 
-logger = logging.getLogger(__name__)
-
 class NotificationAgent(BaseAgent):
     """
     Autonomous agent responsible for:
@@ -14,10 +12,10 @@ class NotificationAgent(BaseAgent):
     - Alerting staff about stale tables
     - Sending queue status updates
     """
+    inputs = ("queue_matches", "table_alerts")
     
     def __init__(self):
         super().__init__("NotificationAgent")
-        self.sent_notifications: List[Dict[str, Any]] = []
 
     def sense(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -26,8 +24,7 @@ class NotificationAgent(BaseAgent):
         # The environment for this agent includes the results of previous agents
         perception = {
             "queue_matches": environment.get("queue_matches", []),
-            "table_alerts": environment.get("table_alerts", []),
-            "queue_updates": environment.get("queue_updates", [])
+            "table_alerts": environment.get("table_alerts", [])
         }
         
         return perception
@@ -47,7 +44,8 @@ class NotificationAgent(BaseAgent):
                 "recipient": match.get("customer_name"),
                 "contact": match.get("phone", "N/A"),
                 "message": f"Hello {match.get('customer_name')}, your Table {match.get('table_number')} is ready! Please proceed to the host stand.",
-                "priority": "high"
+                "priority": "high",
+                "table_number": match.get("table_number")
             })
             
         # 2. Stale Table Alerts (from Table Agent alerts)
@@ -56,36 +54,26 @@ class NotificationAgent(BaseAgent):
                 "type": "staff_alert",
                 "recipient": "Floor Manager",
                 "message": f"ALERT: Table {alert.get('table_number')} has been occupied for {alert.get('duration'):.0f} minutes. Please check on the guests.",
-                "priority": "medium"
+                "priority": "medium",
+                "table_number": alert.get("table_number")
             })
             
         return decisions
 
     def act(self, decision: Dict[str, Any]) -> Any:
         """
-        Act: "Send" the notifications (log them and store in state)
-        In a real app, this would call Twilio, SendGrid, etc.
+        Act: Hand the notifications over for delivery
+        The orchestrator queues them in the notification outbox, which
+        drops repeats and delivers them in the background
+        (services/notifications.py); nothing is sent from the cycle.
         """
-        notifications_sent = []
+        if self.logger.isEnabledFor(logging.DEBUG):
+            for item in decision["to_send"]:
+                self.logger.debug("[NOTIFICATION QUEUED] To: %s | Msg: %s",
+                                  item.get("recipient"), item.get("message"))
         
-        for item in decision["to_send"]:
-            # Simulate sending
-            log_msg = f"[NOTIFICATION SENT] To: {item.get('recipient')} | Msg: {item.get('message')}"
-            logger.info(log_msg)
-            
-            # Store in state for frontend to see
-            notification_record = {
-                "id": len(self.sent_notifications) + 1,
-                "type": item["type"],
-                "recipient": item["recipient"],
-                "message": item["message"],
-                "timestamp": "now" # In real app, use datetime
-            }
-            self.sent_notifications.append(notification_record)
-            notifications_sent.append(notification_record)
-            
         return {
             "agent": self.name,
             "status": "success",
-            "notifications_sent": notifications_sent
+            "notifications": decision["to_send"]
         }
@@ -1,17 +1,645 @@
 """
 Agent Orchestrator - Coordinates all autonomous agents
 """
-from agents.table_agent import TableAgent
+from agents.table_agent import TableAgent, STALE_OCCUPANCY_MINUTES
 from agents.queue_agent import QueueAgent
 from agents.eta_agent import ETAAgent
 from agents.notification_agent import NotificationAgent
-from typing import Dict, Any, List
+from agents.pipeline import AgentPipeline
+from agents.deadlines import DeadlineHeap
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, bindparam, func, or_
 from sqlalchemy.orm import Session
-from models.models import Table, QueueEntry
+from models.models import (
+    Table, QueueEntry, TableStatus, TableTurnover, FloorEventKind, DEFAULT_LOCATION, DEFAULT_ZONE, queue_order
+)
+from models.records import (
+    TableRecord, QueueRecord, TABLE_COLUMNS, QUEUE_COLUMNS, table_record, queue_record
+)
+from agents.eta_model import TurnoverModel
+from services.notifications import enqueue_notifications
+from services.events import queue_event, add_events
+from services.metrics import metrics, clock
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Worker threads for running independent zones' cycles in parallel
+ORCHESTRATION_WORKERS = int(os.getenv("ORCHESTRATION_WORKERS", "4"))
+
+# Worker threads for running a cycle's independent agents side by side
+# (1 runs them one after another on the cycle's thread)
+AGENT_PIPELINE_WORKERS = int(os.getenv("AGENT_PIPELINE_WORKERS", "3"))
+
+# A shard of the floor: (location, zone)
+ZoneKey = Tuple[str, str]
+DEFAULT_ZONE_KEY: ZoneKey = (DEFAULT_LOCATION, DEFAULT_ZONE)
+
+def zone_of(record) -> ZoneKey:
+    """
+    The (location, zone) shard a table or queue entry belongs to
+    """
+    return (record.location or DEFAULT_LOCATION, record.zone or DEFAULT_ZONE)
+
+class ZoneFloor:
+    """
+    The rows of one (location, zone) shard, indexed for its agents, plus
+    the changes since that zone's last cycle
+    """
+
+    def __init__(self, key: ZoneKey):
+        self.key = key
+        self.tables: Dict[int, TableRecord] = {}
+        self.queue: Dict[int, QueueRecord] = {}
+        self.tables_by_status: Dict[str, Dict[int, TableRecord]] = {}
+        # Occupied tables past their stale deadline (see FloorState.expire_due)
+        self.stale: set = set()
+        self._ordered_queue: Optional[List[QueueRecord]] = None
+        # Entry id -> position, derived along with _ordered_queue
+        self._positions: Dict[int, int] = {}
+        self.reset_delta(full=True)
+
+    def reset_delta(self, full: bool = False) -> None:
+        self.changed_tables: Dict[int, TableRecord] = {}
+        self.changed_queue: Dict[int, QueueRecord] = {}
+        self.removed_queue: set = set()
+        self.full = full
+
+    def put_table(self, record: TableRecord) -> None:
+        previous = self.tables.get(record.id)
+        if previous is not None:
+            self.tables_by_status.get(previous.status, {}).pop(record.id, None)
+        self.tables[record.id] = record
+        self.tables_by_status.setdefault(record.status, {})[record.id] = record
+        self.changed_tables[record.id] = record
+
+    def drop_table(self, table_id: int) -> None:
+        previous = self.tables.pop(table_id, None)
+        self.stale.discard(table_id)
+        if previous is not None:
+            self.tables_by_status.get(previous.status, {}).pop(table_id, None)
+            self.changed_tables.pop(table_id, None)
+            # Table deltas carry no removals; let the agents rebuild
+            self.full = True
+
+    def put_queue_entry(self, record: QueueRecord) -> None:
+        """
+        Add or replace an entry. The order is re-derived on the next read
+        unless the entry joined at the back or kept its place.
+        """
+        previous = self.queue.get(record.id)
+        self.queue[record.id] = record
+        self.changed_queue[record.id] = record
+        self.removed_queue.discard(record.id)
+        ordered = self._ordered_queue
+        if ordered is not None:
+            if previous is None and (not ordered or queue_order(record) > queue_order(ordered[-1])):
+                # Joining at the back leaves everyone else's position alone
+                ordered.append(record)
+                self._positions[record.id] = len(ordered)
+                return
+            if previous is not None and queue_order(previous) == queue_order(record):
+                ordered[self._positions[record.id] - 1] = record
+                return
+        self._ordered_queue = None
+
+    def patch_queue_entry(self, record: QueueRecord) -> None:
+        """
+        Swap in a new version of an entry whose place in the queue is
+        unchanged, without reporting it as a change
+        """
+        self.queue[record.id] = record
+        if record.id in self.changed_queue:
+            self.changed_queue[record.id] = record
+        if self._ordered_queue is not None:
+            self._ordered_queue[self._positions[record.id] - 1] = record
+
+    def drop_queue_entry(self, entry_id: int) -> None:
+        self.queue.pop(entry_id, None)
+        self.changed_queue.pop(entry_id, None)
+        self.removed_queue.add(entry_id)
+        self._ordered_queue = None
+
+    def take_delta(self) -> Dict[str, Any]:
+        delta = {
+            "full": self.full,
+            "tables": self.changed_tables,
+            "queue": self.changed_queue,
+            "removed_queue": self.removed_queue
+        }
+        self.reset_delta()
+        return delta
+
+    def ordered_queue(self) -> List[QueueRecord]:
+        """
+        The queue in order, deriving each entry's position from it
+        """
+        if self._ordered_queue is None:
+            self._ordered_queue = sorted(self.queue.values(), key=queue_order)
+            self._positions = {
+                record.id: position for position, record in enumerate(self._ordered_queue, start=1)
+            }
+        return self._ordered_queue
+
+    def positioned(self, record: QueueRecord) -> QueueRecord:
+        """
+        A copy of the entry carrying its current position
+        """
+        self.ordered_queue()
+        return record._replace(position=self._positions.get(record.id))
+
+    def positioned_queue(self) -> List[QueueRecord]:
+        return [record._replace(position=position)
+                for position, record in enumerate(self.ordered_queue(), start=1)]
+
+    def environment(self) -> Dict[str, Any]:
+        return {
+            "zone": self.key,
+            "tables": list(self.tables.values()),
+            "queue": list(self.ordered_queue()),
+            "available_tables": list(self.tables_by_status.get("available", {}).values()),
+            "occupied_tables": list(self.tables_by_status.get("occupied", {}).values()),
+            # Longest occupied first
+            "stale_tables": sorted((self.tables[table_id] for table_id in self.stale),
+                                   key=lambda table: table.occupied_since)
+        }
+
+class FloorState:
+    """
+    Process-local, write-through cache of tables and queue entries.
+    Endpoints push their committed writes here so an agent cycle no
+    longer reloads the whole floor from the database.
+
+    Rows are sharded by (location, zone); each ZoneFloor tracks which
+    rows changed since that zone's last take_delta() so agents update
+    incrementally and only zones with changes need a cycle. Every change
+    is reported to registered listeners (e.g. the floor feed).
+
+    Every change bumps a monotonically increasing version (per process),
+    stamped on the rows it touched, so readers can ask "what changed
+    since version N" or use the version as an ETag.
+
+    Occupied tables are also kept in a min-heap by the time they turn
+    stale, so finding the stale ones costs nothing until one is due.
+
+    Rows are held as immutable records (models/records.py): a change
+    swaps a record rather than editing it, so an environment handed to
+    the agents stays consistent however long they work on it.
+    """
+
+    # Removed-entry tombstones kept for ?since= readers before pruning
+    MAX_TOMBSTONES = 10000
+
+    def __init__(self):
+        self.tables: Dict[int, TableRecord] = {}
+        self.queue: Dict[int, QueueRecord] = {}
+        self.zones: Dict[ZoneKey, ZoneFloor] = {}
+        self.loaded = False
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Zones with changes not yet taken by a cycle
+        self._dirty_zones: set = set()
+        # Table id -> when its current occupancy turns stale
+        self.deadlines = DeadlineHeap()
+        self._deadline_listeners: List[Callable[[datetime], None]] = []
+        
+        self.version = 0
+        # Last version that changed each kind of row ("tables", "queue")
+        self.kind_versions: Dict[str, int] = {"tables": 0, "queue": 0}
+        self.epoch = uuid.uuid4().hex[:8]
+        # Row id -> version of its last change, oldest change first
+        self._table_versions: Dict[int, int] = {}
+        self._queue_versions: Dict[int, int] = {}
+        self._removed_versions: Dict[int, int] = {}
+        # Versions at or below this cannot be answered incrementally
+        self._history_start = 0
+
+    def _bump(self, *kinds: str) -> int:
+        self.version += 1
+        for kind in kinds or self.kind_versions:
+            self.kind_versions[kind] = self.version
+        return self.version
+
+    @staticmethod
+    def _stamp(versions: Dict[int, int], row_id: int, version: int) -> None:
+        versions.pop(row_id, None)
+        versions[row_id] = version
+
+    def etag(self, version: Optional[int] = None) -> str:
+        """
+        Weak ETag for a floor version (the current one by default)
+        """
+        return f'W/"{self.epoch}-{self.version if version is None else version}"'
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback for change events. Callbacks run on the writing
+        thread while the cache lock is held, so they must not block.
+        """
+        self._listeners.append(listener)
+
+    def add_deadline_listener(self, listener: Callable[[datetime], None]) -> None:
+        """
+        Register listener(deadline) for when the earliest stale deadline
+        moves earlier. Runs with the cache lock held, so it must not block.
+        """
+        self._deadline_listeners.append(listener)
+
+    def _deadline_moved(self) -> None:
+        deadline = self.deadlines.next_deadline()
+        if deadline is not None:
+            for listener in self._deadline_listeners:
+                listener(deadline)
+
+    @staticmethod
+    def _stale_deadline(record: TableRecord) -> Optional[datetime]:
+        if record.status != TableStatus.OCCUPIED or not record.occupied_since:
+            return None
+        return record.occupied_since + timedelta(minutes=STALE_OCCUPANCY_MINUTES)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("FloorState listener failed")
+
+    def _zone(self, key: ZoneKey) -> ZoneFloor:
+        zone = self.zones.get(key)
+        if zone is None:
+            zone = self.zones[key] = ZoneFloor(key)
+        return zone
+
+    def resync(self, db: Session) -> None:
+        """
+        Rebuild the cache from the database. Only the record columns are
+        selected, straight into records, without building ORM objects.
+        """
+        tables = db.execute(select(*TABLE_COLUMNS).where(
+            or_(Table.status != TableStatus.OCCUPIED, Table.status.is_(None))
+        )).all()
+        # Occupied tables come oldest-first off the (status, occupied_since)
+        # index, so the agents' occupied buckets start out sorted
+        tables += db.execute(select(*TABLE_COLUMNS).where(
+            Table.status == TableStatus.OCCUPIED
+        ).order_by(Table.occupied_since)).all()
+        queue = db.execute(select(*QUEUE_COLUMNS).order_by(
+            QueueEntry.location, QueueEntry.zone, QueueEntry.joined_at, QueueEntry.id
+        )).all()
+        
+        with self._lock:
+            self.tables = {}
+            self.queue = {}
+            self.zones = {}
+            for row in tables:
+                self._put_table(TableRecord._make(row), track=False)
+            self.deadlines.rebuild({
+                record.id: deadline for record in self.tables.values()
+                if (deadline := self._stale_deadline(record)) is not None
+            })
+            for row in queue:
+                record = QueueRecord(*row)
+                self.queue[record.id] = record
+                self._zone(zone_of(record)).put_queue_entry(record)
+            for zone in self.zones.values():
+                zone.reset_delta(full=True)
+            self._dirty_zones = set(self.zones)
+            self._table_versions = {}
+            self._queue_versions = {}
+            self._removed_versions = {}
+            self._history_start = self._bump()
+            self.loaded = True
+            self._deadline_moved()
+        
+        logger.info("FloorState resynced: %d tables, %d in queue, %d zones",
+                    len(self.tables), len(self.queue), len(self.zones))
+
+    def _put_table(self, record: TableRecord, track: bool = True) -> None:
+        key = zone_of(record)
+        previous = self.tables.get(record.id)
+        if previous is not None and zone_of(previous) != key:
+            self.zones[zone_of(previous)].drop_table(record.id)
+            self._dirty_zones.add(zone_of(previous))
+        self.tables[record.id] = record
+        zone = self._zone(key)
+        zone.put_table(record)
+        self._dirty_zones.add(key)
+        if not track:
+            return
+        
+        # Re-arm the table's stale deadline: O(log T). A table already past
+        # it is flagged again by the next expire_due().
+        zone.stale.discard(record.id)
+        deadline = self._stale_deadline(record)
+        if deadline is None:
+            self.deadlines.cancel(record.id)
+        elif self.deadlines.schedule(record.id, deadline):
+            self._deadline_moved()
+
+    def upsert_table(self, table: Table) -> None:
+        """
+        Record a committed table insert/update
+        """
+        self.upsert_tables([table])
+
+    def upsert_tables(self, tables: List[Any]) -> None:
+        """
+        Record a batch of committed table inserts/updates (ORM rows or
+        detached records) as one floor version
+        """
+        if not tables:
+            return
+        with self._lock:
+            version = self._bump("tables")
+            if not self.loaded:
+                return
+            for table in tables:
+                record = table if isinstance(table, TableRecord) else table_record(table)
+                self._put_table(record)
+                self._stamp(self._table_versions, record.id, version)
+                self._emit({"type": "table_updated", "table": record})
+
+    def upsert_queue_entry(self, entry: QueueEntry) -> None:
+        """
+        Record a committed queue insert/update
+        """
+        self.upsert_queue_entries([entry])
+
+    def upsert_queue_entries(self, entries: List[QueueEntry]) -> None:
+        """
+        Record a batch of committed queue inserts/updates as one floor version
+        """
+        if not entries:
+            return
+        with self._lock:
+            version = self._bump("queue")
+            if not self.loaded:
+                return
+            for entry in entries:
+                record = queue_record(entry)
+                self._stamp(self._queue_versions, entry.id, version)
+                self._removed_versions.pop(entry.id, None)
+                key = zone_of(record)
+                previous = self.queue.get(entry.id)
+                if previous is not None and zone_of(previous) != key:
+                    self.zones[zone_of(previous)].drop_queue_entry(entry.id)
+                    self._dirty_zones.add(zone_of(previous))
+                self.queue[entry.id] = record
+                zone = self._zone(key)
+                zone.put_queue_entry(record)
+                self._dirty_zones.add(key)
+                if self._listeners:
+                    self._emit({"type": "queue_updated", "entry": zone.positioned(record)})
+
+    def remove_queue_entry(self, entry_id: int) -> None:
+        """
+        Record a committed queue deletion
+        """
+        with self._lock:
+            version = self._bump("queue")
+            if not self.loaded:
+                return
+            record = self.queue.pop(entry_id, None)
+            self._queue_versions.pop(entry_id, None)
+            self._stamp(self._removed_versions, entry_id, version)
+            if len(self._removed_versions) > self.MAX_TOMBSTONES:
+                oldest = next(iter(self._removed_versions))
+                self._history_start = self._removed_versions.pop(oldest)
+            if record is not None:
+                key = zone_of(record)
+                self.zones[key].drop_queue_entry(entry_id)
+                self._dirty_zones.add(key)
+            self._emit({"type": "queue_removed", "id": entry_id})
+
+    def update_queue_fields(self, entry_id: int, **fields) -> None:
+        """
+        Apply column changes written back by the orchestrator (never the
+        join time, so the entry keeps its place). These are the agents'
+        own decisions, so they are not reported as changed rows.
+        """
+        with self._lock:
+            record = self.queue.get(entry_id)
+            if record is not None:
+                record = self.queue[entry_id] = record._replace(**fields)
+                self.zones[zone_of(record)].patch_queue_entry(record)
+
+    def apply_queue_patch(self, patches: List[Dict[str, Any]]) -> None:
+        """
+        Apply a cycle's write-back ({"id": ..., field: value, ...} per entry)
+        and report it as a single event
+        """
+        if not patches:
+            return
+        with self._lock:
+            version = self._bump("queue")
+            for patch in patches:
+                fields = {key: value for key, value in patch.items() if key != "id"}
+                self.update_queue_fields(patch["id"], **fields)
+                if patch["id"] in self.queue:
+                    self._stamp(self._queue_versions, patch["id"], version)
+            self._emit({"type": "queue_patch", "entries": patches})
+
+    def changes_since(self, since: int, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rows changed after version `since`: changed tables, changed queue
+        entries and removed queue entry ids. Everything is returned with
+        "full" set when that history is not available here: pruned
+        (resync, old tombstones), or never this cache's to begin with (a
+        version ahead of it, or an epoch from another process).
+        """
+        with self._lock:
+            if (since < self._history_start or since > self.version
+                    or (epoch is not None and epoch != self.epoch)):
+                return {
+                    "epoch": self.epoch,
+                    "version": self.version,
+                    "full": True,
+                    "tables": list(self.tables.values()),
+                    "queue": [entry for key in sorted(self.zones)
+                              for entry in self.zones[key].positioned_queue()],
+                    "removed": []
+                }
+            
+            def newer(versions: Dict[int, int]) -> List[int]:
+                ids = []
+                for row_id, version in reversed(versions.items()):
+                    if version <= since:
+                        break
+                    ids.append(row_id)
+                ids.reverse()
+                return ids
+            
+            return {
+                "epoch": self.epoch,
+                "version": self.version,
+                "full": False,
+                "tables": [self.tables[i] for i in newer(self._table_versions)],
+                "queue": [self._positioned(self.queue[i]) for i in newer(self._queue_versions)],
+                "removed": newer(self._removed_versions)
+            }
+
+    def _positioned(self, record: QueueRecord) -> QueueRecord:
+        return self.zones[zone_of(record)].positioned(record)
+
+    def queue_entry(self, entry_id: int) -> Optional[QueueRecord]:
+        """
+        A cached queue entry with its position derived, or None
+        """
+        with self._lock:
+            record = self.queue.get(entry_id)
+            return self._positioned(record) if record is not None else None
+
+    def expire_due(self, now: Optional[datetime] = None) -> List[ZoneKey]:
+        """
+        Flag the occupied tables whose stale deadline has passed and mark
+        their zones for a cycle. Pops only the expired heap entries.
+        Returns the zones affected. Only callers that go on to run those
+        zones may call this (the scheduler's deadline tick, multi-zone
+        cycles); reads leave due deadlines for them.
+        """
+        with self._lock:
+            due = self.deadlines.pop_due(now or datetime.utcnow())
+            zones = set()
+            for table_id in due:
+                record = self.tables.get(table_id)
+                if record is not None:
+                    key = zone_of(record)
+                    self.zones[key].stale.add(table_id)
+                    zones.add(key)
+            self._dirty_zones |= zones
+            return sorted(zones)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """
+        When the next occupied table turns stale, if any is occupied
+        """
+        with self._lock:
+            return self.deadlines.next_deadline()
+
+    def has_zone(self, zone: ZoneKey) -> bool:
+        """
+        Whether any table or queue entry has been placed in the zone
+        """
+        with self._lock:
+            return zone in self.zones
+
+    def zone_keys(self) -> List[ZoneKey]:
+        """
+        Every zone on the floor, in order
+        """
+        with self._lock:
+            return sorted(self.zones)
+
+    def dirty_zones(self) -> List[ZoneKey]:
+        """
+        Zones with changes that no cycle has taken yet
+        """
+        with self._lock:
+            return sorted(self._dirty_zones)
+
+    def counts(self) -> Dict[str, Dict[tuple, int]]:
+        """
+        Table counts by (location, zone, status) and queue lengths by
+        (location, zone), for the metrics gauges
+        """
+        with self._lock:
+            tables = {
+                (key[0], key[1], getattr(status, "value", status)): len(bucket)
+                for key, zone in self.zones.items()
+                for status, bucket in zone.tables_by_status.items()
+            }
+            queue = {key: len(zone.queue) for key, zone in self.zones.items()}
+        return {"tables": tables, "queue": queue}
+
+    def take_delta(self, zone: ZoneKey = DEFAULT_ZONE_KEY) -> Dict[str, Any]:
+        """
+        Return the zone's rows changed since the previous call and start a
+        new delta. "full" is set after a resync, when agents must recompute.
+        """
+        with self._lock:
+            self._dirty_zones.discard(zone)
+            return self._zone(zone).take_delta()
+
+    def requeue_zone(self, zone: ZoneKey) -> None:
+        """
+        Put back a zone whose cycle failed after taking its delta: the
+        zone is marked dirty and its next cycle recomputes in full, since
+        the changes that delta carried were never acted on
+        """
+        with self._lock:
+            zone_floor = self.zones.get(zone)
+            if zone_floor is not None:
+                zone_floor.full = True
+                self._dirty_zones.add(zone)
+
+    def environment_and_delta(self, zone: ZoneKey = DEFAULT_ZONE_KEY) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Build a zone's environment and take its delta atomically, so no
+        write lands in one but not the other
+        """
+        with self._lock:
+            return self.environment(zone), self.take_delta(zone)
+
+    def environment(self, zone: Optional[ZoneKey] = None) -> Dict[str, Any]:
+        """
+        Build the agent environment for one zone, or a fleet-wide view
+        of every zone when none is given. An unknown zone gets an empty
+        environment and is not registered; only writes create zones.
+        """
+        with self._lock:
+            if zone is not None:
+                zone_floor = self.zones.get(zone)
+                return (zone_floor or ZoneFloor(zone)).environment()
+            return {
+                "tables": list(self.tables.values()),
+                "queue": [
+                    entry for key in sorted(self.zones)
+                    for entry in self.zones[key].ordered_queue()
+                ],
+                "available_tables": [
+                    table for zone_floor in self.zones.values()
+                    for table in zone_floor.tables_by_status.get("available", {}).values()
+                ],
+                "occupied_tables": [
+                    table for zone_floor in self.zones.values()
+                    for table in zone_floor.tables_by_status.get("occupied", {}).values()
+                ],
+                "stale_tables": [
+                    zone_floor.tables[table_id] for zone_floor in self.zones.values()
+                    for table_id in zone_floor.stale
+                ]
+            }
+
+class ZoneAgents:
+    """
+    The agents of one zone. Their incremental state mirrors that zone's
+    floor, so every zone gets its own set; the lock keeps cycles of one
+    zone from overlapping while different zones run concurrently.
+    """
+
+    def __init__(self, key: ZoneKey, match_mode: str, turnover_model: TurnoverModel):
+        self.key = key
+        self.table_agent = TableAgent()
+        self.queue_agent = QueueAgent(match_mode=match_mode)
+        self.eta_agent = ETAAgent()
+        self.eta_agent.model = turnover_model
+        self.notification_agent = NotificationAgent()
+        self.pipeline = AgentPipeline([
+            ("table_agent", self.table_agent),
+            ("queue_agent", self.queue_agent),
+            ("eta_agent", self.eta_agent),
+            ("notification_agent", self.notification_agent)
+        ])
+        # (queue entry, table) pairs matched by the last cycle, so the
+        # event log records a match once rather than every cycle
+        self.matched: set = set()
+        self.lock = threading.Lock()
+
 class AgentOrchestrator:
     """
     Orchestrates multiple agents to work together
@@ -19,93 +647,308 @@ class AgentOrchestrator:
     """
     
     def __init__(self):
-        self.table_agent = TableAgent()
-        self.queue_agent = QueueAgent()
-        self.eta_agent = ETAAgent()
-        self.notification_agent = NotificationAgent()
-        logger.info("AgentOrchestrator initialized with all agents")
+        self.match_mode = os.getenv("QUEUE_MATCH_MODE", "greedy")
+        # Dining times are learned across the whole fleet and shared by every zone
+        self.turnover_model = TurnoverModel(default_dining_time=ETAAgent.DEFAULT_DINING_TIME)
+        self.floor = FloorState()
+        self.zone_agents: Dict[ZoneKey, ZoneAgents] = {}
+        self._agents_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._agents_pool: Optional[ThreadPoolExecutor] = None
+        self._notification_listeners: List[Callable[[int], None]] = []
+        # Each zone's agents are built by its first cycle (see agents_for)
+        logger.debug("AgentOrchestrator initialized")
 
-    def prepare_environment(self, db: Session) -> Dict[str, Any]:
+    def agents_for(self, zone: ZoneKey) -> ZoneAgents:
         """
-        Prepare the environment state for agents
+        The zone's agent set, created on first use
         """
-        tables = db.query(Table).all()
-        queue = db.query(QueueEntry).order_by(QueueEntry.position).all()
-        
-        available_tables = [t for t in tables if t.status == "available"]
-        occupied_tables = [t for t in tables if t.status == "occupied"]
-        
+        with self._agents_lock:
+            agents = self.zone_agents.get(zone)
+            if agents is None:
+                agents = self.zone_agents[zone] = ZoneAgents(zone, self.match_mode, self.turnover_model)
+            return agents
+
+    def _agent_pool(self) -> Optional[ThreadPoolExecutor]:
+        # Separate from the zone pool: zone cycles block on their agents
+        if AGENT_PIPELINE_WORKERS <= 1:
+            return None
+        with self._agents_lock:
+            if self._agents_pool is None:
+                self._agents_pool = ThreadPoolExecutor(max_workers=AGENT_PIPELINE_WORKERS,
+                                                       thread_name_prefix="agent")
+            return self._agents_pool
+
+    def add_notification_listener(self, listener: Callable[[int], None]) -> None:
+        """
+        Call listener(count) after a cycle commits newly queued notifications
+        """
+        self._notification_listeners.append(listener)
+
+    # The default zone's agents, for single-floor callers
+    @property
+    def table_agent(self) -> TableAgent:
+        return self.agents_for(DEFAULT_ZONE_KEY).table_agent
+
+    @property
+    def queue_agent(self) -> QueueAgent:
+        return self.agents_for(DEFAULT_ZONE_KEY).queue_agent
+
+    @property
+    def eta_agent(self) -> ETAAgent:
+        return self.agents_for(DEFAULT_ZONE_KEY).eta_agent
+
+    @property
+    def notification_agent(self) -> NotificationAgent:
+        return self.agents_for(DEFAULT_ZONE_KEY).notification_agent
+
+    def prepare_environment(self, db: Session, zone: ZoneKey = DEFAULT_ZONE_KEY) -> Dict[str, Any]:
+        """
+        Prepare a zone's environment for its agents from the floor cache
+        (loaded from the database on first use)
+        """
+        if not self.floor.loaded:
+            self.resync(db)
+        return self.floor.environment(zone)
+
+    def resync(self, db: Session) -> Dict[str, Any]:
+        """
+        Discard the floor cache and reload it from the database, along
+        with the ETA model's turnover statistics
+        """
+        self.floor.resync(db)
+        duration = TableTurnover.duration_minutes
+        self.turnover_model.load(
+            db.query(
+                TableTurnover.capacity,
+                func.count(duration),
+                func.avg(duration),
+                func.avg(duration * duration)
+            ).group_by(TableTurnover.capacity).all()
+        )
         return {
-            "tables": tables,
-            "queue": queue,
-            "available_tables": available_tables,
-            "occupied_tables": occupied_tables
+            "tables": len(self.floor.tables),
+            "queue_length": len(self.floor.queue),
+            "zones": len(self.floor.zones)
         }
 
-    def run_cycle(self, db: Session) -> Dict[str, Any]:
+    def record_turnover(self, capacity: int, duration_minutes: float) -> None:
+        """
+        Feed a committed occupied -> freed transition to the ETA model
+        """
+        self.turnover_model.observe(capacity, duration_minutes)
+
+    def merge_queue_updates(self, eta_updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Run a complete orchestration cycle with all agents
+        Turn ETA updates into row mappings, dropping entries whose cached
+        values are already current
         """
-        logger.info("Starting agent orchestration cycle")
+        mappings = []
+        for eta_update in eta_updates:
+            record = self.floor.queue.get(eta_update["queue_entry_id"])
+            if record is not None and record.estimated_wait_time != eta_update["estimated_wait_time"]:
+                mappings.append({
+                    "entry_id": record.id,
+                    "estimated_wait_time": eta_update["estimated_wait_time"]
+                })
+        return mappings
+
+    def apply_queue_updates(self, db: Session, eta_updates: List[Dict[str, Any]]) -> int:
+        """
+        Write changed ETAs with one bulk UPDATE, commit, and write them
+        through to the floor cache. Queue order is fixed at join time, so
+        no other columns change. Returns the number of rows written.
+        """
+        mappings = self.merge_queue_updates(eta_updates)
         
-        # Prepare environment
-        environment = self.prepare_environment(db)
+        if mappings:
+            # Core executemany: rows deleted since the cycle started simply
+            # match nothing instead of failing the whole batch
+            db.execute(
+                update(QueueEntry.__table__)
+                .where(QueueEntry.__table__.c.id == bindparam("entry_id"))
+                .values(estimated_wait_time=bindparam("estimated_wait_time")),
+                mappings
+            )
+        db.commit()
         
-        # Run Table Agent
-        table_result = self.table_agent.run(environment)
+        self.floor.apply_queue_patch([
+            {"id": mapping["entry_id"], "estimated_wait_time": mapping["estimated_wait_time"]}
+            for mapping in mappings
+        ])
+        return len(mappings)
+
+    def record_matches(self, db: Session, agents: ZoneAgents,
+                       matches: List[Dict[str, Any]]) -> set:
+        """
+        Add a queue_match event for each match the zone's previous cycle
+        did not already make. Does not commit. Returns this cycle's pairs.
+        """
+        now = datetime.utcnow()
+        pairs = {(match["queue_entry_id"], match["table_id"]) for match in matches}
+        # Endpoints remove entries while the cycle runs: read each one once,
+        # under the floor lock, and skip the ones already gone
+        entries = {entry_id: self.floor.queue_entry(entry_id) for entry_id, _ in pairs - agents.matched}
+        add_events(db, [
+            queue_event(FloorEventKind.QUEUE_MATCH, entries[entry_id], now, table_id=table_id)
+            for entry_id, table_id in pairs - agents.matched if entries[entry_id] is not None
+        ])
+        return pairs
+
+    def run_zone_cycle(self, db: Session, zone: ZoneKey, full: bool = False) -> Dict[str, Any]:
+        """
+        Run a complete orchestration cycle with all agents of one zone
+
+        Agents receive the zone's rows changed since its previous cycle and
+        update incrementally; full=True forces every agent to recompute
+        from scratch.
+        """
+        agents = self.agents_for(zone)
+        with agents.lock:
+            try:
+                return self._run_zone_cycle(db, agents, full)
+            except Exception:
+                # The delta was taken before anything was written back
+                db.rollback()
+                self.floor.requeue_zone(agents.key)
+                raise
+
+    def _run_zone_cycle(self, db: Session, agents: ZoneAgents, full: bool) -> Dict[str, Any]:
+        logger.debug("Starting agent orchestration cycle for zone %s/%s", agents.key[0], agents.key[1])
+        started = clock()
         
-        # Run Queue Agent
-        queue_result = self.queue_agent.run(environment)
+        # Prepare environment and the changes since the last cycle
+        if not self.floor.loaded:
+            self.resync(db)
+        environment, delta = self.floor.environment_and_delta(agents.key)
+        if full:
+            delta = None
         
-        # Run ETA Agent
-        eta_result = self.eta_agent.run(environment)
+        # Table and Queue agents run side by side; the ETA and Notification
+        # agents follow once the matches (and alerts) they read are in
+        run = agents.pipeline.run(environment, delta, executor=self._agent_pool())
+        table_result = run["results"]["table_agent"]
+        queue_result = run["results"]["queue_agent"]
+        eta_result = run["results"]["eta_agent"]
+        notification_result = run["results"]["notification_agent"]
         
-        # Run Notification Agent (needs results from previous agents)
-        notification_environment = environment.copy()
-        notification_environment.update({
-            "queue_matches": queue_result.get("matches", []),
-            "table_alerts": table_result.get("alerts", []),
-            "queue_updates": queue_result.get("queue_updates", [])
-        })
-        notification_result = self.notification_agent.run(notification_environment)
-        
-        # Apply ETA updates to database
-        for eta_update in eta_result.get("eta_updates", []):
-            queue_entry = db.query(QueueEntry).filter(
-                QueueEntry.id == eta_update["queue_entry_id"]
-            ).first()
-            if queue_entry:
-                queue_entry.estimated_wait_time = eta_update["estimated_wait_time"]
-        
-        # Apply queue position updates
-        for queue_update in queue_result.get("queue_updates", []):
-            queue_entry = db.query(QueueEntry).filter(
-                QueueEntry.id == queue_update["queue_entry_id"]
-            ).first()
-            if queue_entry:
-                queue_entry.position = queue_update["new_position"]
+        # Queue notifications in the outbox; they commit with the ETA updates
+        writeback_started = clock()
+        queued = enqueue_notifications(db, notification_result.get("notifications", []), agents.key)
+        matched = self.record_matches(db, agents, queue_result.get("matches", []))
         
-        db.commit()
+        # Apply ETA updates to database in one batch
+        self.apply_queue_updates(db, eta_result.get("eta_updates", []))
+        writeback_seconds = clock() - writeback_started
+        agents.matched = matched
+        if queued:
+            for listener in list(self._notification_listeners):
+                listener(queued)
         
         # Compile results
         orchestration_result = {
             "timestamp": environment.get("current_time"),
+            "zone": f"{agents.key[0]}/{agents.key[1]}",
             "table_agent": table_result,
             "queue_agent": queue_result,
             "eta_agent": eta_result,
             "notification_agent": notification_result,
+            "timings": run["timings"],
             "summary": {
                 "total_tables": len(environment["tables"]),
-                "available_tables": len(environment["available_tables"]),
+                # Tables left free once this cycle's matches are seated
+                "available_tables": len(environment["available_tables"]) - len(queue_result.get("matches", [])),
                 "queue_length": len(environment["queue"]),
                 "matches_found": len(queue_result.get("matches", [])),
-                "alerts": len(table_result.get("alerts", []))
+                "alerts": len(table_result.get("alerts", [])),
+                "notifications_queued": queued
             }
         }
         
-        logger.info(f"Orchestration cycle complete: {orchestration_result['summary']}")
+        # The one line every cycle logs, whatever the sampling
+        logger.info("Orchestration cycle complete for zone %s: %s",
+                    orchestration_result["zone"], orchestration_result["summary"])
         
+        if metrics.enabled:
+            seconds = clock() - started
+            metrics.record_cycle({
+                "zone": orchestration_result["zone"],
+                "timestamp": datetime.utcnow().isoformat(),
+                "full": delta is None or bool(delta.get("full")),
+                "duration_ms": round(seconds * 1000, 3),
+                "writeback_ms": round(writeback_seconds * 1000, 3),
+                "agents": {name: dict(agent.last_timings)
+                           for name, agent in agents.pipeline.nodes.items()},
+                "summary": orchestration_result["summary"]
+            }, seconds, writeback_seconds)
+
         return orchestration_result
 
+    def _zones_to_run(self, full: bool) -> List[ZoneKey]:
+        # Zones with pending changes; every zone for full or manual cycles
+        zones = [] if full else self.floor.dirty_zones()
+        return zones or self.floor.zone_keys() or [DEFAULT_ZONE_KEY]
+
+    @staticmethod
+    def _combine(results: Dict[ZoneKey, Dict[str, Any]]) -> Dict[str, Any]:
+        summary: Dict[str, int] = {}
+        for result in results.values():
+            for key, value in result["summary"].items():
+                summary[key] = summary.get(key, 0) + value
+        summary["zones"] = len(results)
+        return {
+            "zones": {f"{zone[0]}/{zone[1]}": result for zone, result in results.items()},
+            "summary": summary
+        }
+
+    def run_cycle(self, db: Session, full: bool = False,
+                  zone: Optional[ZoneKey] = None) -> Dict[str, Any]:
+        """
+        Run orchestration for one zone, or otherwise for every zone with
+        changes since its last cycle (all zones when full=True or when
+        nothing changed), one after the other on this session
+        """
+        if not self.floor.loaded:
+            self.resync(db)
+        if zone is not None:
+            return self.run_zone_cycle(db, zone, full)
+        # The zones this dirties run below
+        self.floor.expire_due()
+        return self._combine({
+            key: self.run_zone_cycle(db, key, full)
+            for key in self._zones_to_run(full)
+        })
+
+    def run_pending(self, session_factory: Callable[[], Session],
+                    full: bool = False) -> Dict[str, Any]:
+        """
+        Like run_cycle, but independent zones run in parallel on a worker
+        pool (ORCHESTRATION_WORKERS), each with its own session
+        """
+        def run_zone(zone: ZoneKey) -> Dict[str, Any]:
+            db = session_factory()
+            try:
+                return self.run_zone_cycle(db, zone, full)
+            finally:
+                db.close()
+        
+        if not self.floor.loaded:
+            db = session_factory()
+            try:
+                self.resync(db)
+            finally:
+                db.close()
+        
+        self.floor.expire_due()
+        zones = self._zones_to_run(full)
+        if len(zones) == 1:
+            return self._combine({zones[0]: run_zone(zones[0])})
+        
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=ORCHESTRATION_WORKERS,
+                                            thread_name_prefix="zone-cycle")
+        futures = {zone: self._pool.submit(run_zone, zone) for zone in zones}
+        return self._combine({zone: future.result() for zone, future in futures.items()})
+
 # Global orchestrator instance
 orchestrator = AgentOrchestrator()
@@ -0,0 +1,121 @@
+"""
+Agent Pipeline - Runs a set of agents as a dependency graph
+Each agent declares the keys it reads from other agents (inputs) and the
+keys it publishes (outputs). Agents whose inputs are all available run
+together, concurrently when a worker pool is given; results are merged
+in declaration order, so the outcome never depends on which thread
+finished first.
+"""
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+import time
+import logging
+
+from agents.base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+class AgentPipeline:
+    """
+    Dependency graph over named agents, built once from their declared
+    inputs and outputs
+    """
+
+    def __init__(self, nodes: List[Tuple[str, BaseAgent]]):
+        self.nodes: Dict[str, BaseAgent] = dict(nodes)
+        # Published key -> (producing node, key in that node's result)
+        self.producers: Dict[str, Tuple[str, str]] = {}
+        for name, agent in nodes:
+            for published, result_key in agent.outputs.items():
+                if published in self.producers:
+                    raise ValueError(f"'{published}' is published by both "
+                                     f"{self.producers[published][0]} and {name}")
+                self.producers[published] = (name, result_key)
+
+        self.dependencies: Dict[str, List[str]] = {}
+        for name, agent in nodes:
+            missing = [key for key in agent.inputs if key not in self.producers]
+            if missing:
+                raise ValueError(f"{name} reads {missing}, which no agent publishes")
+            self.dependencies[name] = sorted({self.producers[key][0] for key in agent.inputs},
+                                             key=list(self.nodes).index)
+        self.levels = self._levels()
+
+    def _levels(self) -> List[List[str]]:
+        """
+        Group nodes into levels: every node depends only on earlier levels
+        """
+        levels: List[List[str]] = []
+        placed: Dict[str, int] = {}
+        remaining = list(self.nodes)
+        while remaining:
+            ready = [name for name in remaining
+                     if all(dep in placed for dep in self.dependencies[name])]
+            if not ready:
+                raise ValueError(f"Agent dependency cycle among {remaining}")
+            for name in ready:
+                placed[name] = len(levels)
+            levels.append(ready)
+            remaining = [name for name in remaining if name not in placed]
+        return levels
+
+    def upstream(self, targets: List[str]) -> List[str]:
+        """
+        The targets and every node they depend on, in declaration order
+        """
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.dependencies[name])
+        return [name for name in self.nodes if name in needed]
+
+    def run(self, environment: Dict[str, Any], delta: Optional[Dict[str, Any]] = None,
+            executor: Optional[Executor] = None, dry_run: bool = False,
+            targets: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run the graph once. Returns {"results": {node: result},
+        "timings": {node: milliseconds}}, both in declaration order.
+
+        dry_run computes every agent from the full environment with
+        BaseAgent.dry_run, leaving the agents' incremental state alone;
+        callers do not apply its results. targets limits the run to
+        those nodes and their dependencies.
+        """
+        selected = set(self.upstream(targets) if targets else self.nodes)
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+
+        def run_node(name: str) -> Tuple[Any, float]:
+            agent = self.nodes[name]
+            node_environment = environment
+            if agent.inputs:
+                node_environment = environment.copy()
+                for key in agent.inputs:
+                    producer, result_key = self.producers[key]
+                    node_environment[key] = results[producer].get(result_key, [])
+            start = time.perf_counter()
+            if dry_run:
+                result = agent.dry_run(node_environment)
+            else:
+                result = agent.run(node_environment, delta)
+            return result, (time.perf_counter() - start) * 1000
+
+        for level in self.levels:
+            names = [name for name in level if name in selected]
+            if executor is not None and len(names) > 1:
+                futures = [(name, executor.submit(run_node, name)) for name in names]
+                outcomes = [(name, future.result()) for name, future in futures]
+            else:
+                outcomes = [(name, run_node(name)) for name in names]
+            for name, (result, elapsed) in outcomes:
+                results[name] = result
+                timings[name] = round(elapsed, 3)
+
+        order = list(self.nodes)
+        return {
+            "results": {name: results[name] for name in order if name in results},
+            "timings": {name: timings[name] for name in order if name in timings}
+        }
@@ -2,100 +2,202 @@
 Queue Agent - Manages customer queue intelligently
 """
 from agents.base_agent import BaseAgent
-from typing import Dict, Any, List
-import logging
-
-logger = logging.getLogger(__name__)
+from agents.matching import (
+    match_best_fit, match_optimal, seat_utilisation, OPTIMAL_MATCHING_AVAILABLE
+)
+from models.models import queue_order
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional
+import time
 
 class QueueAgent(BaseAgent):
     """
     Autonomous agent responsible for:
     - Managing customer queue
     - Matching party sizes to available tables
-    - Auto-reordering queue based on table availability
+
+    Queue order is fixed at join time (see queue_order), so the agent
+    never renumbers the parties behind a match or a departure.
+
+    match_mode selects the matcher:
+    - "greedy":  first-come best-fit, one party at a time (default)
+    - "optimal": batch assignment over the front of the queue that
+                 minimizes wasted seats, with a fairness penalty for
+                 skipping earlier parties (needs numpy + scipy)
     """
+    outputs = {"queue_matches": "matches"}
     
-    def __init__(self):
+    MATCH_MODES = ("greedy", "optimal")
+    
+    def __init__(self, match_mode: str = "greedy", fairness_weight: float = 0.5,
+                 optimal_batch_size: int = 200, time_budget_ms: float = 20.0):
         super().__init__("QueueAgent")
+        if match_mode not in self.MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{match_mode}', expected one of {self.MATCH_MODES}")
+        if match_mode == "optimal" and not OPTIMAL_MATCHING_AVAILABLE:
+            self.logger.warning("numpy/scipy not installed, optimal matching falls back to greedy")
+        self.match_mode = match_mode
+        self.fairness_weight = fairness_weight
+        self.max_batch_size = optimal_batch_size
+        self.batch_size = optimal_batch_size  # adapted to stay inside the time budget
+        self.time_budget_ms = time_budget_ms
+
+    def _match_optimal(self, queue_entries: List[Any], available_tables: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Run the batch solver, shrinking or growing the solved batch so
+        the solve time stays inside the per-cycle budget
+        """
+        start = time.perf_counter()
+        pairs = match_optimal(
+            queue_entries, available_tables,
+            fairness_weight=self.fairness_weight,
+            max_batch=self.batch_size
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if elapsed_ms > self.time_budget_ms:
+            self.batch_size = max(10, self.batch_size // 2)
+        elif elapsed_ms < self.time_budget_ms / 4:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+        
+        self.state["last_solve_ms"] = round(elapsed_ms, 3)
+        return pairs
 
     def sense(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sense: Gather queue and table information
         """
         queue = environment.get("queue", [])
+        
+        self.state["entries"] = {entry.id: entry for entry in queue}
+        self.state["ordered"] = sorted(queue, key=queue_order)
+        # queue_order of each entry in "ordered", for bisecting
+        self.state["order_keys"] = [queue_order(entry) for entry in self.state["ordered"]]
+        
+        return self._perceive(environment, queue_changed=True, incremental=False)
+
+    def sense_delta(self, environment: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sense incrementally: move only the entries that joined, changed or
+        left within the cached ordered queue, by bisection
+        """
+        entries = self.state.get("entries")
+        if entries is None:
+            return None
+        
+        ordered, keys = self.state["ordered"], self.state["order_keys"]
+        for entry_id in delta["removed_queue"]:
+            entry = entries.pop(entry_id, None)
+            if entry is not None:
+                index = bisect_left(keys, queue_order(entry))
+                del ordered[index], keys[index]
+        for entry in sorted(delta["queue"].values(), key=queue_order):
+            previous = entries.get(entry.id)
+            entries[entry.id] = entry
+            key = queue_order(entry)
+            if previous is not None:
+                index = bisect_left(keys, queue_order(previous))
+                if keys[index] == key:
+                    ordered[index] = entry
+                    continue
+                del ordered[index], keys[index]
+            index = bisect_left(keys, key)
+            ordered.insert(index, entry)
+            keys.insert(index, key)
+        
+        queue_changed = bool(delta["queue"] or delta["removed_queue"])
+        perception = self._perceive(environment, queue_changed=queue_changed, incremental=True)
+        
+        # Nobody was matched last cycle and no table has changed since, so
+        # the parties already in line still fit none of the free tables:
+        # only those who joined or changed can be matched. The optimal
+        # matcher works on a window at the front of the queue, so it can
+        # only be skipped when the queue did not change at all.
+        if self.state.get("unmatched") and not delta["tables"]:
+            if self.match_mode != "optimal" or not OPTIMAL_MATCHING_AVAILABLE:
+                perception["match_candidates"] = sorted(delta["queue"].values(), key=queue_order)
+            elif not queue_changed:
+                perception["match_candidates"] = []
+        return perception
+
+    def _perceive(self, environment: Dict[str, Any], queue_changed: bool,
+                  incremental: bool) -> Dict[str, Any]:
         available_tables = environment.get("available_tables", [])
+        queue_entries = self.state["ordered"]
         
         perception = {
-            "queue_length": len(queue),
-            "queue_entries": sorted(queue, key=lambda x: x.position),
+            "queue_length": len(queue_entries),
+            "queue_entries": queue_entries,
+            "queue_changed": queue_changed,
+            "incremental": incremental,
+            # Parties worth matching, when fewer than the whole queue
+            "match_candidates": None,
             "available_tables": available_tables,
             "table_capacities": [t.capacity for t in available_tables]
         }
         
-        logger.info(f"QueueAgent sensed: {perception['queue_length']} in queue, "
-                   f"{len(available_tables)} tables available")
+        if self.log_cycle:
+            self.logger.info("sensed: %d in queue, %d tables available",
+                             perception["queue_length"], len(available_tables))
         
         return perception
 
     def decide(self, perception: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Decide: Match customers to tables and reorder queue
+        Decide: Match customers to tables
         """
         decisions = {
             "matches": [],
-            "queue_updates": [],
-            "notifications": []
+            "notifications": [],
+            "matching": {}
         }
         
         queue_entries = perception["queue_entries"]
+        if perception["match_candidates"] is not None:
+            queue_entries = perception["match_candidates"]
         available_tables = perception["available_tables"]
         
         # Match customers to tables
-        for entry in queue_entries:
-            # Find best fitting table (smallest table that fits party size)
-            suitable_tables = [
-                t for t in available_tables 
-                if t.capacity >= entry.party_size
-            ]
+        greedy_pairs = match_best_fit(queue_entries, available_tables)
+        greedy_stats = seat_utilisation(greedy_pairs, available_tables)
+        
+        if self.match_mode == "optimal" and OPTIMAL_MATCHING_AVAILABLE:
+            pairs = self._match_optimal(queue_entries, available_tables)
+            decisions["matching"] = {
+                "mode": "optimal",
+                **seat_utilisation(pairs, available_tables),
+                "greedy": greedy_stats,
+                "solve_ms": self.state["last_solve_ms"],
+                "batch_size": self.batch_size
+            }
+        else:
+            pairs = greedy_pairs
+            decisions["matching"] = {"mode": "greedy", **greedy_stats}
+        self.state["unmatched"] = not pairs
+        
+        for pair in pairs:
+            entry, best_table = pair["entry"], pair["table"]
             
-            if suitable_tables:
-                # Sort by capacity to get best fit
-                best_table = min(suitable_tables, key=lambda t: t.capacity)
-                
-                decisions["matches"].append({
-                    "queue_entry_id": entry.id,
-                    "customer_name": entry.name,
-                    "party_size": entry.party_size,
-                    "table_id": best_table.id,
-                    "table_number": best_table.number,
-                    "table_capacity": best_table.capacity
-                })
-                
-                decisions["notifications"].append({
-                    "type": "table_ready",
-                    "customer_name": entry.name,
-                    "table_number": best_table.number,
-                    "phone": entry.phone
-                })
-                
-                # Remove matched table from available list
-                available_tables.remove(best_table)
-        
-        # Reorder remaining queue
-        remaining_queue = [
-            e for e in queue_entries 
-            if e.id not in [m["queue_entry_id"] for m in decisions["matches"]]
-        ]
-        
-        for idx, entry in enumerate(remaining_queue, start=1):
-            if entry.position != idx:
-                decisions["queue_updates"].append({
-                    "queue_entry_id": entry.id,
-                    "new_position": idx
-                })
-        
-        logger.info(f"QueueAgent decided: {len(decisions['matches'])} matches, "
-                   f"{len(decisions['notifications'])} notifications")
+            decisions["matches"].append({
+                "queue_entry_id": entry.id,
+                "customer_name": entry.name,
+                "party_size": entry.party_size,
+                "phone": entry.phone,
+                "table_id": best_table.id,
+                "table_number": best_table.number,
+                "table_capacity": best_table.capacity
+            })
+            
+            decisions["notifications"].append({
+                "type": "table_ready",
+                "customer_name": entry.name,
+                "table_number": best_table.number,
+                "phone": entry.phone
+            })
+        
+        if self.log_cycle:
+            self.logger.info("decided: %d matches, %d notifications",
+                             len(decisions["matches"]), len(decisions["notifications"]))
         
         return decisions
 
@@ -106,6 +208,6 @@ class QueueAgent(BaseAgent):
         return {
             "agent": self.name,
             "matches": decision["matches"],
-            "queue_updates": decision["queue_updates"],
-            "notifications": decision["notifications"]
+            "notifications": decision["notifications"],
+            "matching": decision["matching"]
         }
@@ -2,11 +2,12 @@
 Table Agent - Monitors and manages table states autonomously
 """
 from agents.base_agent import BaseAgent
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
-import logging
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import os
 
-logger = logging.getLogger(__name__)
+# An occupancy longer than this (in minutes) raises a stale-table alert
+STALE_OCCUPANCY_MINUTES = int(os.getenv("STALE_OCCUPANCY_MINUTES", "60"))
 
 class TableAgent(BaseAgent):
     """
@@ -15,48 +16,75 @@ class TableAgent(BaseAgent):
     - Detecting stale occupancies
     - Suggesting table availability updates
     """
+    outputs = {"table_alerts": "alerts"}
     
     def __init__(self):
         super().__init__("TableAgent")
         self.avg_dining_time = 45  # Average dining time in minutes
-        self.warning_threshold = 60  # Warn if occupied > 60 minutes
+        self.warning_threshold = STALE_OCCUPANCY_MINUTES  # Warn if occupied longer
 
     def sense(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sense: Gather current table states from database
         """
         tables = environment.get("tables", [])
+        
+        by_status: Dict[str, Dict[int, Any]] = {"available": {}, "occupied": {}, "reserved": {}}
+        for table in tables:
+            by_status.setdefault(table.status, {})[table.id] = table
+        self.state["tables_by_status"] = by_status
+        
+        return self._perceive(environment)
+
+    def sense_delta(self, environment: Dict[str, Any], delta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sense incrementally: move only the changed tables between status buckets
+        """
+        by_status = self.state.get("tables_by_status")
+        if by_status is None:
+            return None
+        
+        for table in delta["tables"].values():
+            for bucket in by_status.values():
+                bucket.pop(table.id, None)
+            by_status.setdefault(table.status, {})[table.id] = table
+        
+        return self._perceive(environment)
+
+    def _perceive(self, environment: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the perception from the cached status buckets
+        """
+        by_status = self.state["tables_by_status"]
         current_time = datetime.utcnow()
         
         perception = {
-            "total_tables": len(tables),
-            "available_tables": [],
-            "occupied_tables": [],
-            "reserved_tables": [],
+            "total_tables": sum(len(bucket) for bucket in by_status.values()),
+            "available_tables": by_status["available"].values(),
+            "occupied_tables": by_status["occupied"].values(),
+            "reserved_tables": by_status["reserved"].values(),
             "stale_occupancies": [],
             "current_time": current_time
         }
         
-        for table in tables:
-            if table.status == "available":
-                perception["available_tables"].append(table)
-            elif table.status == "occupied":
-                perception["occupied_tables"].append(table)
-                
-                # Check for stale occupancies
-                if table.occupied_since:
-                    duration = (current_time - table.occupied_since).total_seconds() / 60
-                    if duration > self.warning_threshold:
-                        perception["stale_occupancies"].append({
-                            "table": table,
-                            "duration": duration
-                        })
-            elif table.status == "reserved":
-                perception["reserved_tables"].append(table)
+        # The floor's deadline heap hands over the stale tables; without
+        # one (e.g. a hand-built environment) every occupied table is checked
+        stale_tables = environment.get("stale_tables")
+        for table in by_status["occupied"].values() if stale_tables is None else stale_tables:
+            if not table.occupied_since:
+                continue
+            duration = (current_time - table.occupied_since).total_seconds() / 60
+            if duration > self.warning_threshold or stale_tables is not None:
+                perception["stale_occupancies"].append({
+                    "table": table,
+                    "duration": duration
+                })
         
-        logger.info(f"TableAgent sensed: {len(perception['available_tables'])} available, "
-                   f"{len(perception['occupied_tables'])} occupied, "
-                   f"{len(perception['stale_occupancies'])} stale")
+        if self.log_cycle:
+            self.logger.info("sensed: %d available, %d occupied, %d stale",
+                             len(perception["available_tables"]),
+                             len(perception["occupied_tables"]),
+                             len(perception["stale_occupancies"]))
         
         return perception
 
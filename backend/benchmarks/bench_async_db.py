@@ -0,0 +1,120 @@
+"""
+Benchmark: blocking vs async sessions under concurrent load
+
+Serves the same slow-ish query from two endpoints of an in-process FastAPI
+app: one doing blocking Session I/O inside `async def` (the old pattern),
+one using the async session dependency from database.db (aiosqlite when
+installed, otherwise the threaded fallback). Concurrent clients hit each
+endpoint while a probe measures the latency of a cheap request.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_db [--tables 2000] [--clients 8] [--requests 200]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+# Point the app's database module at a scratch file before it is imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_async.db")
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+
+from database.db import (
+    Base, SessionLocal, engine, get_db, get_async_db, ASYNC_DB_AVAILABLE, DB_POOL_SIZE
+)
+from models.models import Table, TableStatus
+
+# Self-join that keeps SQLite busy for a few milliseconds per call
+SLOW_QUERY = text(
+    "SELECT count(*) FROM tables a JOIN tables b ON a.capacity = b.capacity "
+    "WHERE a.id < b.id"
+)
+
+def seed(n_tables: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        Table(number=f"T{i}", capacity=(2, 4, 6, 8)[i % 4], status=TableStatus.AVAILABLE)
+        for i in range(n_tables)
+    ])
+    db.commit()
+    db.close()
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking(db = Depends(get_db)):
+        return {"pairs": db.execute(SLOW_QUERY).scalar()}
+
+    @app.get("/async")
+    async def non_blocking(db = Depends(get_async_db)):
+        return {"pairs": (await db.execute(SLOW_QUERY)).scalar()}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+async def run_load(client: httpx.AsyncClient, path: str, clients: int, requests: int):
+    pending = iter(range(requests))
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async def worker():
+        for _ in pending:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    async def probe():
+        # Latency counted from when the ping was due, so event loop stalls show up
+        while not done.is_set():
+            due = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            await client.get("/ping")
+            probe_latencies.append(time.perf_counter() - due)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return requests / elapsed, probe_latencies
+
+async def run(args) -> None:
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the pools and the page cache
+        await client.get("/blocking")
+        await client.get("/async")
+        for path in ("/blocking", "/async"):
+            throughput, latencies = await run_load(client, path, args.clients, args.requests)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"  {path:10s} {throughput:8.1f} req/s, ping p95 {p95 * 1000:7.2f} ms "
+                  f"({len(latencies)} probes)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    seed(args.tables)
+    driver = "aiosqlite" if ASYNC_DB_AVAILABLE else "threaded sync fallback"
+    print(f"{args.tables} tables, {args.clients} clients, {args.requests} requests per endpoint, "
+          f"async path: {driver}, pool size {DB_POOL_SIZE}")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
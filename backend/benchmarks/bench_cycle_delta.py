@@ -0,0 +1,95 @@
+"""
+Benchmark: incremental vs full orchestration cycles
+
+Builds a fully occupied floor and a queue of parties in SQLite, then times
+run_cycle after small changes, once with the delta protocol and once
+forcing a full recompute. Only the cycle is timed; the write that
+precedes it (commit and floor write-through) is not. Two kinds of change
+are measured for each queue size:
+
+- join:  one party joins the back of the queue
+- table: one occupied table is reserved (a table change, which moves
+         every party's predicted wait)
+
+Usage (from backend/):
+    python -m benchmarks.bench_cycle_delta [--tables 1000] [--queue 1000,20000] [--events 50]
+"""
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database.db import Base
+from models.models import Table, QueueEntry, TableStatus
+from agents.orchestrator import AgentOrchestrator
+
+def make_session(n_tables: int, n_queue: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    db.execute(insert(Table), [
+        {"number": f"T{i}", "capacity": (2, 4, 6, 8)[i % 4],
+         "status": TableStatus.OCCUPIED, "occupied_since": now - timedelta(minutes=i % 40)}
+        for i in range(n_tables)
+    ])
+    db.execute(insert(QueueEntry), [
+        {"name": f"Party {i}", "party_size": 2 + i % 6, "estimated_wait_time": 15,
+         "joined_at": now - timedelta(seconds=n_queue - i), "notified": 0}
+        for i in range(n_queue)
+    ])
+    db.commit()
+    return db
+
+def join(orchestrator: AgentOrchestrator, db, k: int) -> None:
+    entry = QueueEntry(name=f"Walk-in {k}", party_size=2 + k % 6, estimated_wait_time=15,
+                       joined_at=datetime.utcnow())
+    db.add(entry)
+    db.commit()
+    orchestrator.floor.upsert_queue_entry(entry)
+
+def reserve_table(orchestrator: AgentOrchestrator, db, k: int) -> None:
+    table = db.get(Table, k + 1)
+    table.status = TableStatus.RESERVED
+    table.occupied_since = None
+    db.commit()
+    orchestrator.floor.upsert_table(table)
+
+def time_cycles(orchestrator: AgentOrchestrator, db, change: Callable, events: int,
+                full: bool, offset: int) -> float:
+    elapsed = 0.0
+    for k in range(events):
+        change(orchestrator, db, offset + k)
+        start = time.perf_counter()
+        orchestrator.run_cycle(db, full=full)
+        elapsed += time.perf_counter() - start
+    return elapsed / events
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--queue", default="1000,20000", help="comma-separated queue sizes")
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    events = min(args.events, args.tables // 4)
+    print(f"Floor: {args.tables} occupied tables, {events} changes per measurement")
+
+    for n_queue in (int(size) for size in args.queue.split(",")):
+        for label, change in (("join", join), ("table", reserve_table)):
+            db = make_session(args.tables, n_queue)
+            orchestrator = AgentOrchestrator()
+            orchestrator.run_cycle(db)
+            delta_time = time_cycles(orchestrator, db, change, events, full=False, offset=0)
+            full_time = time_cycles(orchestrator, db, change, events, full=True, offset=events)
+            print(f"  {n_queue:6d} parties, {label:5s}: delta {delta_time * 1000:8.2f} ms/cycle, "
+                  f"full {full_time * 1000:8.2f} ms/cycle")
+            db.close()
+
+if __name__ == "__main__":
+    main()
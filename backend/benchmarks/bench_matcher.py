@@ -0,0 +1,108 @@
+"""
+Benchmark: QueueAgent table matching
+
+Compares the original scan-per-party matcher against the capacity-indexed
+BestFitMatcher on a synthetic floor, and checks both pick the same tables.
+When numpy/scipy are installed it also times the optimal batch matcher and
+reports seat utilisation next to greedy.
+
+Usage (from backend/):
+    python -m benchmarks.bench_matcher [--tables 1000] [--queue 10000]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from agents.matching import (
+    match_best_fit, match_optimal, seat_utilisation, OPTIMAL_MATCHING_AVAILABLE
+)
+
+def make_floor(n_tables: int, n_queue: int, seed: int = 42):
+    rng = random.Random(seed)
+    tables = [
+        SimpleNamespace(id=i, number=f"T{i}", capacity=rng.choice([2, 2, 4, 4, 4, 6, 8, 10]))
+        for i in range(1, n_tables + 1)
+    ]
+    queue = [
+        SimpleNamespace(id=i, name=f"Party {i}", phone=None, position=i,
+                        party_size=rng.choice([1, 2, 2, 3, 4, 4, 5, 6, 8, 12]))
+        for i in range(1, n_queue + 1)
+    ]
+    return tables, queue
+
+def match_scan(queue_entries, tables):
+    """
+    The original QueueAgent.decide matching loop
+    """
+    available_tables = list(tables)
+    matches = []
+    for entry in queue_entries:
+        suitable_tables = [t for t in available_tables if t.capacity >= entry.party_size]
+        if suitable_tables:
+            best_table = min(suitable_tables, key=lambda t: t.capacity)
+            matches.append({"queue_entry_id": entry.id, "table_id": best_table.id})
+            available_tables.remove(best_table)
+    remaining_queue = [
+        e for e in queue_entries
+        if e.id not in [m["queue_entry_id"] for m in matches]
+    ]
+    return [(m["queue_entry_id"], m["table_id"]) for m in matches], len(remaining_queue)
+
+def match_indexed(queue_entries, tables):
+    pairs = match_best_fit(queue_entries, tables)
+    matched_ids = {p["entry"].id for p in pairs}
+    remaining_queue = [e for e in queue_entries if e.id not in matched_ids]
+    return [(p["entry"].id, p["table"].id) for p in pairs], len(remaining_queue)
+
+def timed(fn, *args, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--queue", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=200, help="optimal matcher batch size")
+    args = parser.parse_args()
+    
+    tables, queue = make_floor(args.tables, args.queue)
+    print(f"Floor: {args.tables} available tables, {args.queue} parties in queue")
+    
+    scan_time, scan_result = timed(match_scan, queue, tables, repeat=args.repeat)
+    indexed_time, indexed_result = timed(match_indexed, queue, tables, repeat=args.repeat)
+    
+    assert scan_result == indexed_result, "indexed matcher disagrees with the original"
+    
+    print(f"  scan matcher:    {scan_time * 1000:9.2f} ms")
+    print(f"  indexed matcher: {indexed_time * 1000:9.2f} ms  ({scan_time / indexed_time:.0f}x)")
+    print(f"  matches: {len(indexed_result[0])}, remaining: {indexed_result[1]}")
+    
+    if not OPTIMAL_MATCHING_AVAILABLE:
+        print("numpy/scipy not installed, skipping optimal matcher")
+        return
+    
+    # Seat utilisation only differs when tables are scarce, so compare on
+    # a floor with fewer free tables than parties at the front of the queue
+    free_tables = tables[:max(1, args.tables // 10)]
+    greedy_pairs = match_best_fit(queue, free_tables)
+    optimal_time, optimal_pairs = timed(
+        match_optimal, queue, free_tables, 0.5, args.batch, repeat=args.repeat
+    )
+    greedy_stats = seat_utilisation(greedy_pairs, free_tables)
+    optimal_stats = seat_utilisation(optimal_pairs, free_tables)
+    
+    print(f"Optimal batch matcher ({len(free_tables)} free tables, batch of {args.batch}):")
+    print(f"  solve time:      {optimal_time * 1000:9.2f} ms")
+    print(f"  greedy  utilisation: {greedy_stats['seat_utilisation']:.1%} "
+          f"({greedy_stats['seated_guests']} guests, {greedy_stats['wasted_seats']} wasted seats)")
+    print(f"  optimal utilisation: {optimal_stats['seat_utilisation']:.1%} "
+          f"({optimal_stats['seated_guests']} guests, {optimal_stats['wasted_seats']} wasted seats)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Benchmark suite: orchestrator and API under synthetic load
+
+For each floor size (10 to 10,000 tables, queues up to 100k parties) and
+each SQLite storage (in-memory and file) it times the cold floor load,
+prepare_environment, every agent's run, a full run_cycle and incremental
+cycles after single-table flips. It then drives the FastAPI app
+in-process with concurrent clients mixing polls, joins, leaves and table
+flips. Results are written as JSON; --compare prints the change against
+an earlier run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite [--floors 10:100,100:1000,1000:10000,10000:100000]
+        [--storage memory,file] [--cycles 20] [--clients 8] [--requests 400]
+        [--out bench_results.json] [--compare previous.json] [--skip-api]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+# The API phase imports the app, which binds to DATABASE_URL at import time
+API_DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_api.db")
+os.environ["DATABASE_URL"] = "sqlite:///" + API_DB_PATH
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.db import Base
+from models.models import Table, QueueEntry, TableStatus
+from agents.orchestrator import AgentOrchestrator, DEFAULT_ZONE_KEY
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Milliseconds: mean, p50, p95 and max of a list of seconds
+    """
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.5) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3)
+    }
+
+def seed(engine, n_tables: int, n_queue: int, rng: random.Random) -> None:
+    """
+    Mostly occupied floor with a few free and reserved tables, and a
+    queue of mixed party sizes, inserted with multi-row statements
+    """
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    tables = []
+    for i in range(n_tables):
+        roll = rng.random()
+        status = (TableStatus.AVAILABLE if roll < 0.25
+                  else TableStatus.RESERVED if roll < 0.3 else TableStatus.OCCUPIED)
+        tables.append({
+            "number": f"T{i}",
+            "capacity": rng.choice((2, 2, 4, 4, 4, 6, 8)),
+            "status": status,
+            "occupied_since": now - timedelta(minutes=rng.randint(0, 90))
+            if status == TableStatus.OCCUPIED else None,
+            "updated_at": now
+        })
+    queue = [
+        {
+            "name": f"Party {i}",
+            "party_size": rng.choice((1, 2, 2, 3, 4, 4, 5, 6, 8)),
+            "estimated_wait_time": 15,
+            "joined_at": now - timedelta(seconds=n_queue - i),
+            "notified": 0
+        }
+        for i in range(n_queue)
+    ]
+    with engine.begin() as connection:
+        if tables:
+            connection.execute(insert(Table), tables)
+        for start in range(0, len(queue), 10000):
+            connection.execute(insert(QueueEntry), queue[start:start + 10000])
+
+def make_engine(storage: str, directory: str, label: str):
+    if storage == "memory":
+        return create_engine("sqlite://", connect_args={"check_same_thread": False},
+                             poolclass=StaticPool)
+    return create_engine(f"sqlite:///{os.path.join(directory, label + '.db')}",
+                         connect_args={"check_same_thread": False})
+
+def flip(db, orchestrator: AgentOrchestrator, table_id: int) -> None:
+    table = db.get(Table, table_id)
+    if table.status == TableStatus.OCCUPIED:
+        table.status, table.occupied_since = TableStatus.AVAILABLE, None
+    else:
+        table.status, table.occupied_since = TableStatus.OCCUPIED, datetime.utcnow()
+    db.commit()
+    orchestrator.floor.upsert_table(table)
+
+def bench_floor(storage: str, n_tables: int, n_queue: int, cycles: int,
+                directory: str, rng: random.Random) -> Dict[str, Any]:
+    engine = make_engine(storage, directory, f"floor_{n_tables}_{n_queue}")
+    started = time.perf_counter()
+    seed(engine, n_tables, n_queue, rng)
+    seed_seconds = time.perf_counter() - started
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    orchestrator = AgentOrchestrator()
+
+    started = time.perf_counter()
+    orchestrator.resync(db)
+    resync_seconds = time.perf_counter() - started
+
+    prepare = []
+    for _ in range(max(3, cycles // 4)):
+        started = time.perf_counter()
+        environment = orchestrator.prepare_environment(db)
+        prepare.append(time.perf_counter() - started)
+
+    # Every agent from scratch, on the same environment the cycle sees
+    agents = orchestrator.agents_for(DEFAULT_ZONE_KEY)
+    agent_runs: Dict[str, List[float]] = {name: [] for name in agents.pipeline.nodes}
+    for _ in range(3):
+        run = agents.pipeline.run(environment, dry_run=True)
+        for name, milliseconds in run["timings"].items():
+            agent_runs[name].append(milliseconds / 1000)
+
+    full_cycles = []
+    for _ in range(3):
+        started = time.perf_counter()
+        orchestrator.run_cycle(db, full=True)
+        full_cycles.append(time.perf_counter() - started)
+
+    incremental = []
+    for _ in range(cycles):
+        flip(db, orchestrator, rng.randint(1, n_tables))
+        started = time.perf_counter()
+        orchestrator.run_cycle(db)
+        incremental.append(time.perf_counter() - started)
+
+    db.close()
+    engine.dispose()
+    return {
+        "storage": storage,
+        "tables": n_tables,
+        "queue": n_queue,
+        "seed_s": round(seed_seconds, 3),
+        "resync": summarize([resync_seconds]),
+        "prepare_environment": summarize(prepare),
+        "agents": {name: summarize(samples) for name, samples in agent_runs.items()},
+        "run_cycle_full": summarize(full_cycles),
+        "run_cycle_incremental": summarize(incremental)
+    }
+
+# ============= API LOAD =============
+
+# Operation mix of the simulated clients
+API_MIX = (("poll_tables", 0.35), ("poll_queue", 0.3), ("join", 0.12),
+           ("leave", 0.1), ("flip_table", 0.13))
+
+async def bench_api(n_tables: int, n_queue: int, clients: int, requests: int,
+                    rng: random.Random) -> Dict[str, Any]:
+    import httpx
+    import main
+    from database.db import engine as app_engine
+
+    seed(app_engine, n_tables, n_queue, rng)
+    await main.startup_event()
+
+    latencies: Dict[str, List[float]] = {name: [] for name, _ in API_MIX}
+    errors: Dict[str, int] = {}
+    joined: List[int] = []
+    names, weights = zip(*API_MIX)
+    remaining = iter(range(requests))
+
+    async def client_loop(client: "httpx.AsyncClient", client_rng: random.Random):
+        for _ in remaining:
+            operation = client_rng.choices(names, weights)[0]
+            if operation == "leave" and not joined:
+                operation = "join"
+            started = time.perf_counter()
+            if operation == "poll_tables":
+                response = await client.get("/api/tables")
+            elif operation == "poll_queue":
+                response = await client.get("/api/queue")
+            elif operation == "join":
+                response = await client.post("/api/queue", json={
+                    "name": "Bench", "party_size": client_rng.choice((2, 4, 6))})
+                if response.status_code == 200:
+                    joined.append(response.json()["id"])
+            elif operation == "leave":
+                response = await client.delete(f"/api/queue/{joined.pop(client_rng.randrange(len(joined)))}")
+            else:
+                status = client_rng.choice(("available", "occupied"))
+                response = await client.put(f"/api/tables/{client_rng.randint(1, n_tables)}",
+                                            json={"status": status})
+            latencies[operation].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[operation] = errors.get(operation, 0) + 1
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, random.Random(rng.random()))
+                               for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    await main.shutdown_event()
+
+    return {
+        "tables": n_tables,
+        "queue": n_queue,
+        "clients": clients,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "operations": {name: summarize(samples) for name, samples in latencies.items() if samples},
+        "errors": errors,
+        "cycles_run": main.scheduler.cycles_run
+    }
+
+# ============= REPORTING =============
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Mean milliseconds by metric path, for comparing runs
+    """
+    flat: Dict[str, float] = {}
+    for floor in results.get("floors", []):
+        prefix = f"{floor['storage']}/{floor['tables']}x{floor['queue']}"
+        for key in ("resync", "prepare_environment", "run_cycle_full", "run_cycle_incremental"):
+            flat[f"{prefix}/{key}"] = floor[key]["mean_ms"]
+        for name, stats in floor["agents"].items():
+            flat[f"{prefix}/{name}"] = stats["mean_ms"]
+    for name, stats in results.get("api", {}).get("operations", {}).items():
+        flat[f"api/{name}"] = stats["mean_ms"]
+    return flat
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    before, after = flatten(previous), flatten(current)
+    print(f"\nCompared with {previous['meta']['commit']} (mean ms, +% is slower):")
+    common = sorted(set(before) & set(after))
+    if not common:
+        print("  no metrics in common (different floors or storage)")
+    for key in common:
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"  {key:60s} {before[key]:10.3f} -> {after[key]:10.3f}  {change:+6.1f}%")
+
+def parse_floors(spec: str) -> List[Tuple[int, int]]:
+    return [tuple(int(part) for part in item.split(":")) for item in spec.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--floors", default="10:100,100:1000,1000:10000,10000:100000",
+                        help="comma-separated tables:queue pairs")
+    parser.add_argument("--storage", default="memory,file")
+    parser.add_argument("--cycles", type=int, default=20, help="incremental cycles per floor")
+    parser.add_argument("--api-floor", default="200:500", help="tables:queue for the API phase")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "floors": []
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for storage in args.storage.split(","):
+            for n_tables, n_queue in parse_floors(args.floors):
+                floor = bench_floor(storage, n_tables, n_queue, args.cycles, directory, rng)
+                results["floors"].append(floor)
+                print(f"  {storage:6s} {n_tables:6d} tables {n_queue:7d} queue: "
+                      f"resync {floor['resync']['mean_ms']:9.1f} ms, "
+                      f"prepare {floor['prepare_environment']['mean_ms']:7.3f} ms, "
+                      f"full cycle {floor['run_cycle_full']['mean_ms']:9.1f} ms, "
+                      f"incremental p50 {floor['run_cycle_incremental']['p50_ms']:8.2f} ms")
+
+    if not args.skip_api:
+        n_tables, n_queue = parse_floors(args.api_floor)[0]
+        api = asyncio.run(bench_api(n_tables, n_queue, args.clients, args.requests, rng))
+        results["api"] = api
+        print(f"  API {n_tables} tables, {args.clients} clients: {api['throughput_rps']} req/s, "
+              f"{api['cycles_run']} cycles")
+        for name, stats in api["operations"].items():
+            print(f"    {name:12s} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  (n={stats['n']})")
+
+    with open(args.out, "w") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(results, json.load(handle))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Query plans: EXPLAIN for every statement the app issues
+Runs the app in-process against a scratch database, drives the endpoints
+and one orchestration cycle, records each distinct SQL statement and
+prints its plan. Plans that scan a whole table are flagged, so a missing
+or unusable index shows up here before it shows up in production.
+
+Usage (from backend/):
+    python -m benchmarks.explain_queries [--tables 200] [--queue 500]
+"""
+import argparse
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app's database module at a scratch file before it is imported.
+# Always a fresh one, never an exported DATABASE_URL: the run seeds rows,
+# flips table statuses and runs agent cycles.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "explain.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database.db import SessionLocal, engine, async_engine, is_sqlite
+from database.migrations import ensure_schema
+from models.models import Table, QueueEntry, TableStatus
+
+def seed(n_tables: int, n_queue: int) -> None:
+    ensure_schema(engine)
+    db = SessionLocal()
+    now = datetime.utcnow()
+    db.add_all([
+        Table(number=f"X{i}", capacity=(2, 4, 6, 8)[i % 4],
+              status=TableStatus.OCCUPIED if i % 2 else TableStatus.AVAILABLE,
+              occupied_since=now - timedelta(minutes=i % 90) if i % 2 else None)
+        for i in range(n_tables)
+    ])
+    db.add_all([
+        QueueEntry(name=f"Guest {i}", party_size=(2, 4, 6)[i % 3], estimated_wait_time=0,
+                   joined_at=now + timedelta(seconds=i))
+        for i in range(n_queue)
+    ])
+    db.commit()
+    db.close()
+
+class StatementRecorder:
+    """
+    Collects distinct statements (with one set of parameters each)
+    from engine cursor events
+    """
+
+    def __init__(self):
+        self.statements = {}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+            return
+        if executemany and parameters:
+            parameters = parameters[0]
+        self.statements.setdefault(statement, parameters)
+
+    def attach(self, target) -> None:
+        event.listen(target, "before_cursor_execute", self)
+
+def exercise(client: TestClient) -> None:
+    tables = client.get("/api/tables").json()
+    client.get("/api/tables", params={"since": 0})
+    client.put(f"/api/tables/{tables[0]['id']}", json={"status": "occupied"})
+    client.put(f"/api/tables/{tables[1]['id']}", json={"status": "available"})
+    joined = client.post("/api/queue", json={"name": "Explain", "party_size": 2}).json()
+    client.get("/api/queue")
+    client.get("/api/queue", params={"since": 0})
+    client.post("/api/agents/run", params={"full": True})
+    client.get("/api/agents/status")
+    if "id" in joined:
+        client.delete(f"/api/queue/{joined['id']}")
+    client.post("/api/agents/resync")
+
+def explain(statement: str, parameters) -> list:
+    prefix = "EXPLAIN QUERY PLAN " if is_sqlite else "EXPLAIN "
+    with engine.connect() as conn:
+        raw = conn.connection.driver_connection.cursor()
+        try:
+            raw.execute(prefix + statement, parameters or ())
+            rows = raw.fetchall()
+        finally:
+            raw.close()
+    # SQLite rows are (id, parent, notused, detail); PostgreSQL rows are one text column
+    return [row[-1] for row in rows]
+
+def is_full_scan(line: str) -> bool:
+    if is_sqlite:
+        return line.startswith("SCAN") and "USING" not in line
+    return "Seq Scan" in line
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--queue", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    recorder = StatementRecorder()
+
+    import main as app_module
+    seed(args.tables, args.queue)
+    recorder.attach(engine)
+    if async_engine is not None:
+        recorder.attach(async_engine.sync_engine)
+
+    with TestClient(app_module.app) as client:
+        exercise(client)
+
+    flagged = 0
+    for statement, parameters in recorder.statements.items():
+        print("-" * 72)
+        print(" ".join(statement.split()))
+        for line in explain(statement, parameters):
+            mark = "  !! " if is_full_scan(line) else "     "
+            flagged += mark.strip() != ""
+            print(f"{mark}{line}")
+    print("-" * 72)
+    print(f"{len(recorder.statements)} statements, {flagged} full table scans")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: memory and load time of the floor's queue records
+
+Seeds a scratch SQLite database with a large queue and loads it three
+ways: as ORM objects (what a session query returns), as SimpleNamespace
+copies of those objects (the floor's previous records) and as
+QueueRecord tuples selected column by column (what FloorState.resync
+does now). For each it reports the load time and the memory the loaded
+entries keep alive, then times and measures a full FloorState.resync.
+Load times are taken with tracemalloc running, so compare them with
+each other rather than with other benchmarks.
+
+Usage (from backend/):
+    python -m benchmarks.floor_memory [--queue 100000] [--tables 1000]
+"""
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from agents.orchestrator import FloorState
+from models.models import QueueEntry
+from models.records import QueueRecord, QUEUE_COLUMNS
+from benchmarks.bench_suite import seed, make_engine
+
+def measure(load: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """
+    Run load; return its result, seconds taken and MB still allocated
+    once it returned (what the result keeps alive)
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, retained / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queue", type=int, default=100000)
+    parser.add_argument("--tables", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = make_engine("file", tempfile.mkdtemp(), "floor_memory")
+    seed(engine, args.tables, args.queue, random.Random(7))
+    order = (QueueEntry.location, QueueEntry.zone, QueueEntry.joined_at, QueueEntry.id)
+
+    def orm_rows():
+        session = Session(engine)
+        return session, session.query(QueueEntry).order_by(*order).all()
+
+    def namespaces():
+        with Session(engine) as session:
+            return [
+                SimpleNamespace(**{column.key: getattr(row, column.key)
+                                   for column in QueueEntry.__table__.columns})
+                for row in session.query(QueueEntry).order_by(*order)
+            ]
+
+    def records():
+        with Session(engine) as session:
+            return [QueueRecord(*row) for row in session.execute(select(*QUEUE_COLUMNS).order_by(*order))]
+
+    print(f"{args.queue} queue entries, {args.tables} tables")
+    print(f"{'representation':<28}{'load ms':>10}{'retained MB':>14}{'bytes/entry':>14}")
+    for label, load in (("ORM objects (in session)", orm_rows),
+                        ("SimpleNamespace copies", namespaces),
+                        ("QueueRecord (columns)", records)):
+        result, seconds, megabytes = measure(load)
+        print(f"{label:<28}{seconds * 1000:>10.0f}{megabytes:>14.1f}{megabytes * 1e6 / args.queue:>14.0f}")
+        if isinstance(result, tuple):
+            result[0].close()
+        del result
+
+    floor = FloorState()
+
+    def resync():
+        with Session(engine) as session:
+            floor.resync(session)
+        return floor
+
+    _, seconds, megabytes = measure(resync)
+    print(f"\nFloorState.resync: {seconds * 1000:.0f} ms, {megabytes:.1f} MB retained "
+          f"(records, zone indexes, deadline heap)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: cold start of the API process
+
+Starts fresh interpreters one after another. Each one reports how long it
+took to import main, run the startup hook, and answer its first and
+second request (GET /api/tables, then GET /api/queue, both in-process
+through ASGITransport). The database is migrated and seeded once
+beforehand, as a deploy would, so the numbers cover what every
+autoscaled worker pays. Pass --env to compare configurations, e.g.
+--env AUTO_MIGRATE=true --env SEED_SAMPLE_DATA=true. --importtime lists
+the modules that take longest to import.
+
+Usage (from backend/):
+    python -m benchmarks.startup_time [--runs 10] [--env KEY=VALUE ...] [--importtime]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+PHASES = ("import", "startup", "first_request", "second_request")
+
+def child() -> None:
+    """
+    Runs in the measured process: time each phase, print them as JSON
+    """
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    async def run() -> Dict[str, float]:
+        import httpx
+
+        await main.startup_event()
+        started_up = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/api/tables")).raise_for_status()
+            first = time.perf_counter()
+            (await client.get("/api/queue")).raise_for_status()
+            second = time.perf_counter()
+        await main.shutdown_event()
+        return {
+            "startup": started_up - imported,
+            "first_request": first - started_up,
+            "second_request": second - first
+        }
+
+    timings = {"import": imported - started, **asyncio.run(run())}
+    print(json.dumps({phase: round(seconds * 1000, 2) for phase, seconds in timings.items()}))
+
+def run_child(env: Dict[str, str]) -> Dict[str, float]:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_time", "--child"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    # Interpreter start and exit included
+    timings["process"] = round((time.perf_counter() - started) * 1000, 2)
+    return timings
+
+def slowest_imports(env: Dict[str, str], limit: int) -> List[str]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    # Top-level imports of the app's own modules and its direct dependencies
+    top = sorted((row for row in rows if row[1] <= 3), reverse=True)[:limit]
+    return [f"{cumulative / 1000:9.1f} ms  {name}" for cumulative, _, name in top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the measured processes")
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    database = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_startup.db")
+    env = dict(os.environ, DATABASE_URL=database, LOG_LEVEL="WARNING")
+    env.update(item.split("=", 1) for item in args.env)
+    subprocess.run([sys.executable, "-m", "database.migrations", "migrate", "--seed"],
+                   env=env, capture_output=True, check=True)
+
+    runs = [run_child(env) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts" + (f" with {' '.join(args.env)}" if args.env else ""))
+    print(f"{'phase':<16}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for phase in PHASES + ("process",):
+        values = [run[phase] for run in runs]
+        print(f"{phase:<16}{statistics.median(values):>12.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+    if args.importtime:
+        print("\nSlowest imports (cumulative):")
+        for line in slowest_imports(env, 15):
+            print(line)
+
+if __name__ == "__main__":
+    main()
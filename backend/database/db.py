@@ -1,4 +1,6 @@
 import os
+import asyncio
+import logging
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
@@ -6,9 +8,11 @@ from sqlalchemy.orm import sessionmaker
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Use PostgreSQL if DATABASE_URL is set, otherwise fall back to SQLite
 SQLALCHEMY_DATABASE_URL = os.getenv(
-    "DATABASE_URL", 
+    "DATABASE_URL",
     "sqlite:///./restaurant.db"
 )
 
@@ -16,9 +20,25 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
 is_sqlite = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
 connect_args = {"check_same_thread": False} if is_sqlite else {}
 
+# Connection pool tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+# "auto" uses the async driver when installed, "false" always uses the sync one
+DB_ASYNC = os.getenv("DB_ASYNC", "auto").lower()
+
+def _pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    # In-memory SQLite uses a single shared connection, not a sized pool
+    if ":memory:" not in url and url not in ("sqlite://", "sqlite+aiosqlite://"):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    return options
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args=connect_args
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=connect_args,
+    **_pool_options(SQLALCHEMY_DATABASE_URL)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -31,3 +51,100 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ============= ASYNC SESSIONS =============
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync database URL onto its async driver
+    """
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC not in ("0", "false", "no"):
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+        ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            **_pool_options(ASYNC_DATABASE_URL)
+        )
+        # Objects stay readable after commit; lazy reloads cannot run under asyncio
+        AsyncSessionLocal = async_sessionmaker(
+            async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    except ImportError as e:
+        logger.info("Async database driver unavailable (%s); using threaded sync sessions", e)
+
+ASYNC_DB_AVAILABLE = AsyncSessionLocal is not None
+
+class ThreadedSession:
+    """
+    Sync Session behind the AsyncSession interface used by the endpoints.
+    Each database call runs in a worker thread so a slow query does not
+    block the event loop. Calls are awaited one at a time, so the session
+    is never used from two threads at once.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def execute(self, statement, *args, **kwargs):
+        return await asyncio.to_thread(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await asyncio.to_thread(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident):
+        return await asyncio.to_thread(self.sync_session.get, entity, ident)
+
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def refresh(self, instance):
+        await asyncio.to_thread(self.sync_session.refresh, instance)
+
+    async def delete(self, instance):
+        self.sync_session.delete(instance)
+
+    async def flush(self):
+        await asyncio.to_thread(self.sync_session.flush)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def close(self):
+        # Only returns the connection to the pool; cheap enough inline
+        self.sync_session.close()
+
+def _threaded_session() -> ThreadedSession:
+    session = SessionLocal()
+    # Match the async sessions: committed objects stay loaded
+    session.expire_on_commit = False
+    return ThreadedSession(session)
+
+# Async dependency for FastAPI routes
+async def get_async_db():
+    db = AsyncSessionLocal() if ASYNC_DB_AVAILABLE else _threaded_session()
+    try:
+        yield db
+    finally:
+        await db.close()
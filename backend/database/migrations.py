@@ -0,0 +1,103 @@
+"""
+Schema migrations - Bring an existing database up to the current models
+create_all() only creates missing tables; databases created by earlier
+versions also need the columns and indexes added since.
+
+The app does not touch the schema when it starts (unless AUTO_MIGRATE is
+set); run this once per deploy instead (from backend/):
+    python -m database.migrations migrate [--seed]
+    python -m database.migrations check
+"""
+from sqlalchemy import inspect, text
+import argparse
+import logging
+import sys
+
+from database.db import Base, engine as default_engine, SessionLocal
+import models.models  # noqa: F401 - registers the tables on Base.metadata
+
+logger = logging.getLogger(__name__)
+
+def pending_changes(engine) -> list:
+    """
+    Tables, columns and indexes the database is missing, without
+    changing anything
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    pending = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            pending.append(table.name)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        pending.extend(f"{table.name}.{column.name}"
+                       for column in table.columns if column.name not in existing)
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        pending.extend(index.name for index in table.indexes if index.name not in indexes)
+    return pending
+
+def ensure_schema(engine) -> list:
+    """
+    Create missing tables, then add missing columns (with their server
+    default) and indexes to existing ones. Returns the changes applied.
+    """
+    Base.metadata.create_all(bind=engine)
+    applied = []
+    inspector = inspect(engine)
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} " \
+                      f"{column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT '{column.server_default.arg}'"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                applied.append(f"{table.name}.{column.name}")
+            
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(bind=connection)
+                    applied.append(index.name)
+    
+    if applied:
+        logger.info("Schema updated: %s", ", ".join(applied))
+    return applied
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create, update or check the database schema")
+    parser.add_argument("command", choices=("migrate", "check"),
+                        help="migrate applies missing changes; check only lists them "
+                             "and exits non-zero if there are any")
+    parser.add_argument("--seed", action="store_true",
+                        help="after migrating, add the sample floor if the database has no tables")
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        pending = pending_changes(default_engine)
+        for change in pending:
+            print(f"missing: {change}")
+        print("Schema is up to date" if not pending else f"{len(pending)} pending change(s)")
+        return 1 if pending else 0
+
+    applied = ensure_schema(default_engine)
+    print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date")
+    if args.seed:
+        from database.seed import seed_sample_data
+        db = SessionLocal()
+        try:
+            print("✅ Database initialized with sample data" if seed_sample_data(db)
+                  else "Database already has tables; sample data not added")
+        finally:
+            db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
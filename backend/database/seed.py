@@ -0,0 +1,38 @@
+"""
+Sample data - A small demo floor for development
+Only added on request: `python -m database.migrations migrate --seed`,
+or SEED_SAMPLE_DATA=true when the app starts.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.models import Table, QueueEntry, TableStatus
+
+def seed_sample_data(db: Session) -> bool:
+    """
+    Add the sample tables and queue to an empty database. Returns whether
+    anything was added.
+    """
+    if db.execute(select(Table.id).limit(1)).first() is not None:
+        return False
+    
+    now = datetime.utcnow()
+    db.add_all([
+        Table(number="T1", capacity=2, status=TableStatus.AVAILABLE),
+        Table(number="T2", capacity=4, status=TableStatus.OCCUPIED, occupied_since=now),
+        Table(number="T3", capacity=4, status=TableStatus.AVAILABLE),
+        Table(number="T4", capacity=6, status=TableStatus.RESERVED),
+        Table(number="T5", capacity=2, status=TableStatus.AVAILABLE),
+        Table(number="T6", capacity=8, status=TableStatus.OCCUPIED, occupied_since=now),
+        Table(number="T7", capacity=4, status=TableStatus.AVAILABLE),
+        Table(number="T8", capacity=2, status=TableStatus.OCCUPIED, occupied_since=now),
+    ])
+    db.add_all([
+        QueueEntry(name="John Doe", party_size=4, phone="555-0001", estimated_wait_time=15),
+        QueueEntry(name="Jane Smith", party_size=2, phone="555-0002", estimated_wait_time=25),
+        QueueEntry(name="Bob Johnson", party_size=6, phone="555-0003", estimated_wait_time=35),
+    ])
+    db.commit()
+    return True
@@ -1,19 +1,61 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
-from database.db import engine, get_db, Base
-from models.models import Table, QueueEntry, TableStatus
+import asyncio
+import os
+
+from services.logging_config import configure_logging
+
+# Before the app modules load, so what they log at import time goes out too
+configure_logging()
+
+from database.db import engine, get_async_db, SessionLocal
+from database.migrations import ensure_schema
+from database.seed import seed_sample_data
+from models.models import (
+    Table, QueueEntry, TableStatus, TableTurnover, FloorEventKind, DEFAULT_LOCATION, DEFAULT_ZONE
+)
 from models.schemas import (
     TableResponse, TableCreate, TableUpdate,
     QueueEntryResponse, QueueEntryCreate
 )
-from agents.orchestrator import orchestrator
+from agents.orchestrator import orchestrator, DEFAULT_ZONE_KEY
+from services.scheduler import OrchestrationScheduler
+from services.broadcast import FloorBroadcaster, serialize_table, serialize_queue_entry, serialize_queue
+from services.response_cache import ResponseCache, encode_json
+from services.notifications import NotificationWorker
+from services.metrics import metrics, clock
+from services.bulk import BULK_MAX_ITEMS, BulkResult, create_tables, update_table_statuses, join_queue_bulk
+from services.events import (
+    table_event, queue_event, read_events, iter_event_pages, event_record, ndjson_chunks, csv_chunks
+)
+
+# Schema changes normally run once per deploy (python -m database.migrations
+# migrate); these let a single dev server migrate and seed itself on startup
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+SEED_SAMPLE_DATA = os.getenv("SEED_SAMPLE_DATA", "false").lower() in ("1", "true", "yes")
+
+# Background scheduler that coalesces writes into agent cycles
+scheduler = OrchestrationScheduler(orchestrator)
+
+# Pushes floor changes to /ws/floor subscribers
+broadcaster = FloorBroadcaster(orchestrator.floor)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Delivers the notifications cycles queue in the outbox
+notification_worker = NotificationWorker()
+orchestrator.add_notification_listener(notification_worker.wake)
+
+# Encoded bodies of the list endpoints, invalidated by floor version
+response_cache = ResponseCache()
+
+# Stale-table alerts depend on the clock, so cached agent status also expires
+AGENT_STATUS_CACHE_SECONDS = float(os.getenv("AGENT_STATUS_CACHE_SECONDS", "5"))
 
 app = FastAPI(
     title="Antigravity Restaurant App",
@@ -34,6 +76,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Floor gauges are read from the cache when /metrics is scraped
+metrics.gauge("floor_tables", "Tables by zone and status",
+              lambda: orchestrator.floor.counts()["tables"], ("location", "zone", "status"))
+metrics.gauge("queue_length", "Parties waiting by zone",
+              lambda: orchestrator.floor.counts()["queue"], ("location", "zone"))
+metrics.gauge("floor_version", "Version of the floor cache", lambda: orchestrator.floor.version)
+metrics.gauge("orchestration_pending_zones", "Zones with changes waiting for a cycle",
+              lambda: len(orchestrator.floor.dirty_zones()))
+
+if metrics.enabled:
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        started = clock()
+        response = await call_next(request)
+        # The route template, so /api/tables/1 and /api/tables/2 share a series
+        route = request.scope.get("route")
+        metrics.record_request(request.method, getattr(route, "path", "unmatched"),
+                               response.status_code, clock() - started)
+        return response
+
 # ============= HEALTH & INFO =============
 
 @app.get("/")
@@ -48,156 +110,456 @@ async def read_root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+# ============= CONDITIONAL READS =============
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+async def _changes_since(since: int, epoch: Optional[str]) -> dict:
+    if not orchestrator.floor.loaded:
+        await asyncio.to_thread(_load_floor)
+    return orchestrator.floor.changes_since(since, epoch)
+
+# ============= BULK ENDPOINTS =============
+
+# Registered ahead of /api/tables/{table_id} so "bulk" is not read as an id
+
+def _check_batch(items: List[Dict[str, Any]]) -> None:
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {BULK_MAX_ITEMS} items per batch (got {len(items)})")
+
+async def _finish_batch(result: BulkResult, wait: bool) -> dict:
+    """
+    One agent cycle for the whole batch, then the per-item report
+    """
+    if result.tables or result.entries:
+        if wait:
+            await scheduler.wait_for_cycle()
+        else:
+            scheduler.mark_dirty()
+    return result.summary()
+
+@app.post("/api/tables/bulk")
+async def create_tables_bulk(items: List[Dict[str, Any]] = Body(...), upsert: bool = False,
+                             wait: bool = False, db = Depends(get_async_db)):
+    """
+    Create a batch of tables in one transaction. ?upsert=true imports a
+    floor layout: tables whose number exists are updated to match.
+    """
+    _check_batch(items)
+    try:
+        result = await db.run_sync(create_tables, items, upsert)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409,
+                            detail="A table number in this batch was created concurrently; retry the batch")
+    orchestrator.floor.upsert_tables(result.tables)
+    for turnover in result.turnovers:
+        orchestrator.record_turnover(turnover["capacity"], turnover["duration_minutes"])
+    return await _finish_batch(result, wait)
+
+@app.put("/api/tables/bulk")
+async def update_tables_bulk(items: List[Dict[str, Any]] = Body(...), wait: bool = False,
+                             db = Depends(get_async_db)):
+    """
+    Set the status of a batch of tables ([{"id": ..., "status": ...}]) in
+    one transaction, e.g. clearing the floor at shift change
+    """
+    _check_batch(items)
+    result = await db.run_sync(update_table_statuses, items)
+    orchestrator.floor.upsert_tables(result.tables)
+    for turnover in result.turnovers:
+        orchestrator.record_turnover(turnover["capacity"], turnover["duration_minutes"])
+    return await _finish_batch(result, wait)
+
+@app.post("/api/queue/bulk")
+async def join_queue_bulk_endpoint(items: List[Dict[str, Any]] = Body(...), wait: bool = False,
+                                   db = Depends(get_async_db)):
+    """
+    Add a batch of parties to the queue in one transaction, in input order
+    (pass ?wait=true to get their agent-computed ETAs)
+    """
+    _check_batch(items)
+    result = await db.run_sync(join_queue_bulk, items)
+    orchestrator.floor.upsert_queue_entries(result.entries)
+    if not orchestrator.floor.loaded:
+        await asyncio.to_thread(_load_floor)
+    summary = await _finish_batch(result, wait)
+    
+    # Positions (and, after the cycle, ETAs) come from the floor cache
+    for item in summary["results"]:
+        record = orchestrator.floor.queue_entry(item["id"]) if item["status"] != "error" else None
+        if record is not None:
+            item["position"] = record.position
+            item["estimated_wait_time"] = record.estimated_wait_time
+    return summary
+
 # ============= TABLE ENDPOINTS =============
 
 @app.get("/api/tables", response_model=List[TableResponse])
-async def get_tables(db: Session = Depends(get_db)):
-    """Get all tables"""
-    tables = db.query(Table).all()
-    return tables
+async def get_tables(request: Request, since: Optional[int] = None, epoch: Optional[str] = None,
+                     db = Depends(get_async_db)):
+    """
+    Get all tables. Honours If-None-Match against the floor version ETag;
+    ?since=<version>&epoch=<epoch> returns only the tables changed after
+    that version (everything, with "full" set, if the cursor is not this
+    process's).
+    """
+    # Taken before reading so a concurrent write can only make it older
+    etag = orchestrator.floor.etag()
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if since is not None:
+        changes = await _changes_since(since, epoch)
+        return JSONResponse(
+            {
+                "epoch": changes["epoch"],
+                "version": changes["version"],
+                "full": changes["full"],
+                "tables": [serialize_table(table) for table in changes["tables"]]
+            },
+            headers={"ETag": orchestrator.floor.etag(changes["version"])}
+        )
+    
+    version = orchestrator.floor.kind_versions["tables"]
+    body = response_cache.get("tables", version)
+    if body is None:
+        tables = (await db.execute(select(Table))).scalars().all()
+        body = response_cache.put("tables", version,
+                                  encode_json([serialize_table(table) for table in tables]))
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @app.post("/api/tables", response_model=TableResponse)
-async def create_table(table: TableCreate, db: Session = Depends(get_db)):
+async def create_table(table: TableCreate, db = Depends(get_async_db)):
     """Create a new table"""
     db_table = Table(**table.dict())
     db.add(db_table)
-    db.commit()
-    db.refresh(db_table)
+    # The event needs the new row's id
+    await db.flush()
+    db.add(table_event(db_table, None, datetime.utcnow()))
+    await db.commit()
+    await db.refresh(db_table)
+    orchestrator.floor.upsert_table(db_table)
     return db_table
 
 @app.put("/api/tables/{table_id}", response_model=TableResponse)
-async def update_table(table_id: int, table_update: TableUpdate, db: Session = Depends(get_db)):
-    """Update table status"""
-    db_table = db.query(Table).filter(Table.id == table_id).first()
+async def update_table(table_id: int, table_update: TableUpdate, wait: bool = False,
+                       db = Depends(get_async_db)):
+    """Update table status (pass ?wait=true to wait for the agent cycle)"""
+    db_table = await db.get(Table, table_id)
     if not db_table:
         raise HTTPException(status_code=404, detail="Table not found")
     
+    now = datetime.utcnow()
+    previous_status = db_table.status
+    turnover = None
+    if (db_table.status == TableStatus.OCCUPIED and db_table.occupied_since
+            and table_update.status != "occupied"):
+        # Record the completed occupancy for the ETA model
+        turnover = TableTurnover(
+            table_id=db_table.id,
+            capacity=db_table.capacity,
+            occupied_at=db_table.occupied_since,
+            freed_at=now,
+            duration_minutes=(now - db_table.occupied_since).total_seconds() / 60
+        )
+        db.add(turnover)
+    
     db_table.status = table_update.status
     if table_update.status == "occupied":
-        db_table.occupied_since = datetime.utcnow()
+        db_table.occupied_since = now
     else:
         db_table.occupied_since = None
     
-    db.commit()
-    db.refresh(db_table)
+    if previous_status != db_table.status:
+        db.add(table_event(db_table, previous_status, now,
+                           turnover.duration_minutes if turnover is not None else None))
     
-    # Trigger agent orchestration after table update
-    orchestrator.run_cycle(db)
+    await db.commit()
+    await db.refresh(db_table)
+    orchestrator.floor.upsert_table(db_table)
+    if turnover is not None:
+        orchestrator.record_turnover(turnover.capacity, turnover.duration_minutes)
+    
+    # Schedule agent orchestration after table update
+    if wait:
+        await scheduler.wait_for_cycle()
+    else:
+        scheduler.mark_dirty()
     
     return db_table
 
 # ============= QUEUE ENDPOINTS =============
 
 @app.get("/api/queue", response_model=List[QueueEntryResponse])
-async def get_queue(db: Session = Depends(get_db)):
-    """Get current queue"""
-    queue = db.query(QueueEntry).order_by(QueueEntry.position).all()
-    return queue
+async def get_queue(request: Request, since: Optional[int] = None, epoch: Optional[str] = None,
+                    db = Depends(get_async_db)):
+    """
+    Get current queue. Honours If-None-Match against the floor version ETag;
+    ?since=<version>&epoch=<epoch> returns only the entries changed or
+    removed after it (everything, with "full" set, if the cursor is not
+    this process's).
+    """
+    etag = orchestrator.floor.etag()
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if since is not None:
+        changes = await _changes_since(since, epoch)
+        return JSONResponse(
+            {
+                "epoch": changes["epoch"],
+                "version": changes["version"],
+                "full": changes["full"],
+                "queue": [serialize_queue_entry(entry) for entry in changes["queue"]],
+                "removed": changes["removed"]
+            },
+            headers={"ETag": orchestrator.floor.etag(changes["version"])}
+        )
+    
+    version = orchestrator.floor.kind_versions["queue"]
+    body = response_cache.get("queue", version)
+    if body is None:
+        queue = (await db.execute(
+            select(QueueEntry).order_by(
+                QueueEntry.location, QueueEntry.zone, QueueEntry.joined_at, QueueEntry.id
+            )
+        )).scalars().all()
+        body = response_cache.put("queue", version,
+                                  encode_json(serialize_queue(queue)))
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @app.post("/api/queue", response_model=QueueEntryResponse)
-async def join_queue(entry: QueueEntryCreate, db: Session = Depends(get_db)):
-    """Add customer to queue"""
-    # Get next position
-    max_position = db.query(QueueEntry).count()
-    
+async def join_queue(entry: QueueEntryCreate, wait: bool = False, db = Depends(get_async_db)):
+    """Add customer to queue (pass ?wait=true to get the agent-computed ETA)"""
+    # A single INSERT: the place in line follows from joined_at and id
     db_entry = QueueEntry(
         **entry.dict(),
-        position=max_position + 1,
         estimated_wait_time=15  # Will be updated by ETA agent
     )
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    await db.flush()
+    db.add(queue_event(FloorEventKind.QUEUE_JOIN, db_entry, db_entry.joined_at or datetime.utcnow()))
+    await db.commit()
+    await db.refresh(db_entry)
+    orchestrator.floor.upsert_queue_entry(db_entry)
+    if not orchestrator.floor.loaded:
+        await asyncio.to_thread(_load_floor)
     
-    # Trigger agent orchestration
-    orchestrator.run_cycle(db)
+    # Schedule agent orchestration
+    if wait:
+        await scheduler.wait_for_cycle()
+    else:
+        scheduler.mark_dirty()
     
-    return db_entry
+    # The cached record carries the derived position (and any new ETA)
+    record = orchestrator.floor.queue_entry(db_entry.id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Queue entry was removed")
+    return record
 
 @app.delete("/api/queue/{entry_id}")
-async def remove_from_queue(entry_id: int, db: Session = Depends(get_db)):
-    """Remove customer from queue (when seated or cancelled)"""
-    db_entry = db.query(QueueEntry).filter(QueueEntry.id == entry_id).first()
+async def remove_from_queue(entry_id: int, wait: bool = False,
+                            reason: Literal["seated", "left"] = "left",
+                            table_id: Optional[int] = None,
+                            db = Depends(get_async_db)):
+    """
+    Remove customer from queue: ?reason=seated (optionally with the
+    table_id) when seated, the default "left" when they gave up or cancelled
+    """
+    db_entry = await db.get(QueueEntry, entry_id)
     if not db_entry:
         raise HTTPException(status_code=404, detail="Queue entry not found")
     
-    db.delete(db_entry)
-    db.commit()
+    kind = FloorEventKind.QUEUE_SEAT if reason == "seated" else FloorEventKind.QUEUE_LEAVE
+    db.add(queue_event(kind, db_entry, datetime.utcnow(), table_id=table_id))
+    await db.delete(db_entry)
+    await db.commit()
+    orchestrator.floor.remove_queue_entry(entry_id)
     
     # Reorder queue
-    orchestrator.run_cycle(db)
+    if wait:
+        await scheduler.wait_for_cycle()
+    else:
+        scheduler.mark_dirty()
     
     return {"message": "Removed from queue"}
 
 # ============= AGENT ENDPOINTS =============
 
 @app.post("/api/agents/run")
-async def run_agents(db: Session = Depends(get_db)):
-    """Manually trigger agent orchestration cycle"""
-    result = orchestrator.run_cycle(db)
+async def run_agents(full: bool = False):
+    """Manually trigger agent orchestration cycle (?full=true recomputes every agent from scratch)"""
+    result = await scheduler.wait_for_cycle(full=full)
     return result
 
+@app.post("/api/agents/resync")
+async def resync_floor(db = Depends(get_async_db)):
+    """Reload the orchestrator's floor cache from the database"""
+    return await db.run_sync(orchestrator.resync)
+
 @app.get("/api/agents/status")
-async def get_agent_status(db: Session = Depends(get_db)):
-    """Get current agent analysis without making changes"""
-    environment = orchestrator.prepare_environment(db)
-    
-    # Run agents in read-only mode
-    table_result = orchestrator.table_agent.run(environment)
-    queue_result = orchestrator.queue_agent.run(environment)
-    
-    notification_env = environment.copy()
-    notification_env.update({
-        "queue_matches": queue_result.get("matches", []),
-        "table_alerts": table_result.get("alerts", []),
-        "queue_updates": queue_result.get("queue_updates", [])
-    })
-    notification_result = orchestrator.notification_agent.run(notification_env)
+async def get_agent_status(location: str = DEFAULT_LOCATION, zone: str = DEFAULT_ZONE,
+                           db = Depends(get_async_db)):
+    """
+    Get current agent analysis of one zone without making changes. The
+    analysis is computed once per floor version, off the event loop,
+    and shared by every caller polling in the meantime.
+    """
+    if not orchestrator.floor.loaded:
+        await db.run_sync(orchestrator.resync)
+    # Reads never register zones: only existing ones (and the default
+    # floor, even while empty) get an agent set and a cache entry
+    if (location, zone) != DEFAULT_ZONE_KEY and not orchestrator.floor.has_zone((location, zone)):
+        raise HTTPException(status_code=404, detail=f"Unknown zone {location}/{zone}")
+    version = orchestrator.floor.version
     
-    return {
-        "table_analysis": table_result,
-        "queue_analysis": queue_result,
-        "notification_analysis": notification_result,
-        "environment_summary": {
-            "total_tables": len(environment["tables"]),
-            "available_tables": len(environment["available_tables"]),
-            "occupied_tables": len(environment["occupied_tables"]),
-            "queue_length": len(environment["queue"])
+    def analyse() -> bytes:
+        environment = orchestrator.floor.environment((location, zone))
+        agents = orchestrator.agents_for((location, zone))
+        
+        # Same graph as the cycle, in dry-run mode; ETAs are not part of the status
+        run = agents.pipeline.run(environment, dry_run=True, targets=["notification_agent"])
+        
+        status = {
+            "zone": f"{location}/{zone}",
+            "version": version,
+            "table_analysis": run["results"]["table_agent"],
+            "queue_analysis": run["results"]["queue_agent"],
+            "notification_analysis": run["results"]["notification_agent"],
+            "timings": run["timings"],
+            "environment_summary": {
+                "total_tables": len(environment["tables"]),
+                "available_tables": len(environment["available_tables"])
+                                    - len(run["results"]["queue_agent"].get("matches", [])),
+                "occupied_tables": len(environment["occupied_tables"]),
+                "queue_length": len(environment["queue"])
+            }
         }
+        return encode_json(jsonable_encoder(status))
+    
+    body = await response_cache.get_or_build(f"agent_status:{location}/{zone}", version,
+                                             lambda: asyncio.to_thread(analyse),
+                                             max_age=AGENT_STATUS_CACHE_SECONDS)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/notifications")
+async def get_notifications():
+    """Most recently delivered notifications (newest first) and delivery counters"""
+    return {
+        "recent": list(reversed(notification_worker.recent)),
+        "stats": notification_worker.stats()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text-format metrics: agent, cycle and request histograms, counters and floor gauges"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/traces")
+async def get_cycle_traces(limit: Optional[int] = None):
+    """Most recent orchestration cycle traces, newest first"""
+    return metrics.recent_traces(limit)
+
+# ============= FLOOR HISTORY =============
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@app.get("/api/events")
+async def get_events(after: int = 0, kind: Optional[List[str]] = Query(None),
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     limit: int = Query(100, ge=1, le=1000)):
+    """
+    One page of the floor event log after the ?after= cursor; pass the
+    returned next_cursor to get the following page
+    """
+    rows = await asyncio.to_thread(read_events, after, kind, since, until, limit)
+    return {
+        "events": [event_record(row) for row in rows],
+        "next_cursor": rows[-1][0] if rows else after
+    }
+
+@app.get("/api/events/export")
+async def export_events(format: Literal["ndjson", "csv"] = "ndjson", after: int = 0,
+                        kind: Optional[List[str]] = Query(None),
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        limit: Optional[int] = Query(None, ge=1)):
+    """
+    Stream the floor event log as NDJSON or CSV, in id order from the
+    ?after= cursor. Rows are read and written a page at a time, so memory
+    use does not grow with the size of the export.
+    """
+    pages = iter_event_pages(after, kind, since, until, limit)
+    chunks = ndjson_chunks(pages) if format == "ndjson" else csv_chunks(pages)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="floor_events.{format}"'}
+    )
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters of the response cache"""
+    return response_cache.stats()
+
+# ============= REAL-TIME FEED =============
+
+def _load_floor():
+    db = SessionLocal()
+    try:
+        orchestrator.prepare_environment(db)
+    finally:
+        db.close()
+
+@app.websocket("/ws/floor")
+async def floor_feed(websocket: WebSocket):
+    """Push a floor snapshot, then table/queue diff events as they happen"""
+    await websocket.accept()
+    if not orchestrator.floor.loaded:
+        await asyncio.to_thread(_load_floor)
+    
+    # Subscribe before the snapshot so no event falls in between
+    subscriber = broadcaster.subscribe()
+    try:
+        await websocket.send_text(broadcaster.snapshot_message())
+        while True:
+            await websocket.send_text(await broadcaster.next_message(subscriber))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
 # ============= INITIALIZATION =============
 
+def _prepare_database():
+    if AUTO_MIGRATE:
+        ensure_schema(engine)
+    if SEED_SAMPLE_DATA:
+        db = SessionLocal()
+        try:
+            if seed_sample_data(db):
+                print("✅ Database initialized with sample data")
+        finally:
+            db.close()
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database with sample data if empty"""
-    db = next(get_db())
-    
-    # Check if tables exist
-    if db.query(Table).count() == 0:
-        # Create sample tables
-        sample_tables = [
-            Table(number="T1", capacity=2, status=TableStatus.AVAILABLE),
-            Table(number="T2", capacity=4, status=TableStatus.OCCUPIED, occupied_since=datetime.utcnow()),
-            Table(number="T3", capacity=4, status=TableStatus.AVAILABLE),
-            Table(number="T4", capacity=6, status=TableStatus.RESERVED),
-            Table(number="T5", capacity=2, status=TableStatus.AVAILABLE),
-            Table(number="T6", capacity=8, status=TableStatus.OCCUPIED, occupied_since=datetime.utcnow()),
-            Table(number="T7", capacity=4, status=TableStatus.AVAILABLE),
-            Table(number="T8", capacity=2, status=TableStatus.OCCUPIED, occupied_since=datetime.utcnow()),
-        ]
-        db.add_all(sample_tables)
-        db.commit()
-        
-        # Create sample queue
-        sample_queue = [
-            QueueEntry(name="John Doe", party_size=4, phone="555-0001", position=1, estimated_wait_time=15),
-            QueueEntry(name="Jane Smith", party_size=2, phone="555-0002", position=2, estimated_wait_time=25),
-            QueueEntry(name="Bob Johnson", party_size=6, phone="555-0003", position=3, estimated_wait_time=35),
-        ]
-        db.add_all(sample_queue)
-        db.commit()
-        
-        print("✅ Database initialized with sample data")
+    """Migrate and seed the database when asked to, then start the background workers"""
+    if AUTO_MIGRATE or SEED_SAMPLE_DATA:
+        await asyncio.to_thread(_prepare_database)
     
-    db.close()
+    broadcaster.bind(asyncio.get_running_loop())
+    await scheduler.start()
+    await notification_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending writes through a final agent cycle, then deliver its notifications"""
+    await scheduler.stop()
+    await notification_worker.stop()
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index, Enum as SQLEnum
 from datetime import datetime
 from database.db import Base
 import enum
 
+# Rows created without a location/zone belong to the single default floor
+DEFAULT_LOCATION = "main"
+DEFAULT_ZONE = "main"
+
 class TableStatus(str, enum.Enum):
     AVAILABLE = "available"
     OCCUPIED = "occupied"
@@ -17,6 +21,14 @@ class Table(Base):
     status = Column(SQLEnum(TableStatus), default=TableStatus.AVAILABLE)
     occupied_since = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    location = Column(String, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION, nullable=False)
+    zone = Column(String, default=DEFAULT_ZONE, server_default=DEFAULT_ZONE, nullable=False)
+
+    __table_args__ = (
+        Index("ix_tables_location_zone_status", "location", "zone", "status"),
+        # Occupied tables oldest-first, for stale checks and ETA simulation
+        Index("ix_tables_status_occupied_since", "status", "occupied_since"),
+    )
 
 class QueueEntry(Base):
     __tablename__ = "queue"
@@ -25,7 +37,110 @@ class QueueEntry(Base):
     name = Column(String)
     party_size = Column(Integer)
     phone = Column(String, nullable=True)
-    position = Column(Integer)
+    # Legacy stored position; live positions are derived from queue_order()
+    position = Column(Integer, nullable=True)
     estimated_wait_time = Column(Integer)  # in minutes
     joined_at = Column(DateTime, default=datetime.utcnow)
     notified = Column(Integer, default=0)  # 0 = not notified, 1 = notified
+    location = Column(String, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION, nullable=False)
+    zone = Column(String, default=DEFAULT_ZONE, server_default=DEFAULT_ZONE, nullable=False)
+
+    __table_args__ = (
+        Index("ix_queue_location_zone_joined", "location", "zone", "joined_at", "id"),
+    )
+
+def queue_order(entry) -> tuple:
+    """
+    Sort key of a zone's queue: join time, then id. Both are fixed when the
+    party joins, so joins and leaves never rewrite other rows.
+    """
+    return (entry.joined_at or datetime.min, entry.id)
+
+class TableTurnover(Base):
+    __tablename__ = "table_turnover"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_id = Column(Integer, index=True)
+    capacity = Column(Integer, index=True)
+    occupied_at = Column(DateTime)
+    freed_at = Column(DateTime, default=datetime.utcnow)
+    duration_minutes = Column(Float)
+
+    __table_args__ = (
+        # Covers the per-capacity aggregate the ETA model loads on resync
+        Index("ix_table_turnover_capacity_duration", "capacity", "duration_minutes"),
+    )
+
+class NotificationStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+class Notification(Base):
+    """
+    Outbox row: queued by an orchestration cycle, delivered by the
+    notification worker
+    """
+    __tablename__ = "notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String)
+    recipient = Column(String)
+    contact = Column(String, nullable=True)
+    message = Column(String)
+    priority = Column(String)
+    table_number = Column(String, nullable=True)
+    location = Column(String, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION, nullable=False)
+    zone = Column(String, default=DEFAULT_ZONE, server_default=DEFAULT_ZONE, nullable=False)
+    # (type, location, zone, recipient, table, time window): repeats within a window are dropped
+    dedup_key = Column(String, unique=True, nullable=False)
+    status = Column(SQLEnum(NotificationStatus), default=NotificationStatus.PENDING)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    # Set by the worker that claimed the row for sending; indexed for its reload
+    claim_token = Column(String, nullable=True, index=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The worker's claim: pending (or abandoned sending) rows that are due, oldest first
+        Index("ix_notifications_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+class FloorEventKind(str, enum.Enum):
+    TABLE_STATUS = "table_status"
+    QUEUE_JOIN = "queue_join"
+    QUEUE_MATCH = "queue_match"
+    QUEUE_SEAT = "queue_seat"
+    QUEUE_LEAVE = "queue_leave"
+
+class FloorEvent(Base):
+    """
+    Append-only history of the floor: table status transitions and queue
+    join/match/seat/leave events. Rows are never updated or deleted, and
+    their id is the export cursor.
+    """
+    __tablename__ = "floor_events"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    location = Column(String, default=DEFAULT_LOCATION, server_default=DEFAULT_LOCATION, nullable=False)
+    zone = Column(String, default=DEFAULT_ZONE, server_default=DEFAULT_ZONE, nullable=False)
+    table_id = Column(Integer, nullable=True)
+    queue_entry_id = Column(Integer, nullable=True)
+    party_size = Column(Integer, nullable=True)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=True)
+    # Occupancy that ended with this transition (table events)
+    duration_minutes = Column(Float, nullable=True)
+    # Time since the party joined (seat and leave events)
+    wait_minutes = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Exports filtered by kind, walked in cursor order
+        Index("ix_floor_events_kind_id", "kind", "id"),
+        Index("ix_floor_events_created_at", "created_at"),
+    )
@@ -0,0 +1,52 @@
+"""
+Floor Records - Immutable, detached snapshots of tables and queue entries
+These are what the floor cache holds and the agents read. They carry no
+session and cannot change underneath a reader, so a cycle can run on
+them from any thread. Changes replace a record instead of editing it.
+"""
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+from models.models import Table, QueueEntry, TableStatus
+
+class TableRecord(NamedTuple):
+    id: int
+    number: str
+    capacity: int
+    status: TableStatus
+    occupied_since: Optional[datetime]
+    updated_at: Optional[datetime]
+    location: str
+    zone: str
+
+class QueueRecord(NamedTuple):
+    id: int
+    name: str
+    party_size: int
+    phone: Optional[str]
+    estimated_wait_time: Optional[int]
+    joined_at: Optional[datetime]
+    notified: int
+    location: str
+    zone: str
+    # Derived from the entry's place in its zone's queue. Only set on the
+    # copies the floor hands out (FloorState.queue_entry, changes_since),
+    # so moving up the queue does not rewrite every record behind it.
+    position: Optional[int] = None
+
+# Columns to select for each record, in field order (a column-only query
+# skips building ORM objects)
+TABLE_COLUMNS = [Table.__table__.c[name] for name in TableRecord._fields]
+QUEUE_COLUMNS = [QueueEntry.__table__.c[name] for name in QueueRecord._fields if name != "position"]
+
+def table_record(table: Any) -> TableRecord:
+    """
+    Snapshot of an ORM table row (or anything with its attributes)
+    """
+    return TableRecord(*(getattr(table, name) for name in TableRecord._fields))
+
+def queue_record(entry: Any) -> QueueRecord:
+    """
+    Snapshot of an ORM queue row, without a position
+    """
+    return QueueRecord(*(getattr(entry, column.key) for column in QUEUE_COLUMNS))
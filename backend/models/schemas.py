@@ -6,6 +6,8 @@ class TableBase(BaseModel):
     number: str
     capacity: int
     status: str
+    location: str = "main"
+    zone: str = "main"
 
 class TableCreate(TableBase):
     pass
@@ -14,6 +16,9 @@ class TableUpdate(BaseModel):
     status: str
     occupied_since: Optional[datetime] = None
 
+class TableBulkUpdate(TableUpdate):
+    id: int
+
 class TableResponse(TableBase):
     id: int
     occupied_since: Optional[datetime]
@@ -26,6 +31,8 @@ class QueueEntryBase(BaseModel):
     name: str
     party_size: int
     phone: Optional[str] = None
+    location: str = "main"
+    zone: str = "main"
 
 class QueueEntryCreate(QueueEntryBase):
     pass
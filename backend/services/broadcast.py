@@ -0,0 +1,139 @@
+"""
+Floor Broadcaster - Pushes floor changes to WebSocket subscribers
+Clients receive one snapshot on connect, then diff events as the floor
+cache changes. Each event is encoded once and fanned out to every
+subscriber through a bounded per-client queue.
+"""
+import asyncio
+import itertools
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+
+from models.schemas import TableResponse, QueueEntryResponse
+
+logger = logging.getLogger(__name__)
+
+# Placed on a subscriber's queue when it fell behind and must resync
+_RESYNC = object()
+
+def serialize_table(record: Any) -> Dict[str, Any]:
+    return TableResponse.model_validate(record).model_dump(mode="json")
+
+def serialize_queue_entry(record: Any) -> Dict[str, Any]:
+    return QueueEntryResponse.model_validate(record).model_dump(mode="json")
+
+def serialize_queue(entries: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Serialize queue rows sorted by zone and queue_order, deriving each
+    entry's position from its place in its zone
+    """
+    rows = []
+    zone, position = None, 0
+    for entry in entries:
+        key = (entry.location, entry.zone)
+        position = position + 1 if key == zone else 1
+        zone = key
+        fields = {name: getattr(entry, name) for name in QueueEntryResponse.model_fields}
+        fields["position"] = position
+        rows.append(QueueEntryResponse.model_validate(fields).model_dump(mode="json"))
+    return rows
+
+class Subscriber:
+    """
+    One connected client: a bounded queue of encoded messages
+    """
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def offer(self, message: str) -> None:
+        """
+        Queue a message without blocking. A client that cannot keep up
+        loses its backlog and gets a fresh snapshot instead.
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(_RESYNC)
+
+class FloorBroadcaster:
+    """
+    Fan-out of floor change events to WebSocket subscribers
+    """
+
+    def __init__(self, floor, max_pending: int = 256):
+        self.floor = floor
+        self.max_pending = max_pending
+        self.subscribers: Set[Subscriber] = set()
+        self._seq = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        floor.add_listener(self._on_floor_event)
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Attach to the event loop the subscribers live on
+        """
+        self._loop = loop
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_pending)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def snapshot_message(self) -> str:
+        """
+        Encode the whole cached floor as a snapshot event
+        """
+        environment = self.floor.environment()
+        return json.dumps({
+            "type": "snapshot",
+            "seq": next(self._seq),
+            "tables": [serialize_table(t) for t in environment["tables"]],
+            "queue": serialize_queue(environment["queue"])
+        })
+
+    async def next_message(self, subscriber: Subscriber) -> str:
+        item = await subscriber.queue.get()
+        if item is _RESYNC:
+            return self.snapshot_message()
+        return item
+
+    def _on_floor_event(self, event: Dict[str, Any]) -> None:
+        if not self.subscribers or self._loop is None:
+            return
+        
+        message = self._encode(event)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is self._loop:
+            self._publish(message)
+        else:
+            # Change made from a worker thread (e.g. a scheduled cycle)
+            self._loop.call_soon_threadsafe(self._publish, message)
+
+    def _encode(self, event: Dict[str, Any]) -> str:
+        payload = {"type": event["type"], "seq": next(self._seq)}
+        if event["type"] == "table_updated":
+            payload["table"] = serialize_table(event["table"])
+        elif event["type"] == "queue_updated":
+            payload["entry"] = serialize_queue_entry(event["entry"])
+        elif event["type"] == "queue_removed":
+            payload["id"] = event["id"]
+        elif event["type"] == "queue_patch":
+            payload["entries"] = event["entries"]
+        return json.dumps(payload)
+
+    def _publish(self, message: str) -> None:
+        for subscriber in list(self.subscribers):
+            subscriber.offer(message)
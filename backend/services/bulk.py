@@ -0,0 +1,273 @@
+"""
+Bulk Writes - Floor layouts, shift-change resets and queue bursts in one go
+Each batch is validated item by item, written with one multi-row INSERT
+or UPDATE in a single transaction, and reported per item. Items that fail
+validation are skipped; the rest still go through.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, insert, update
+from sqlalchemy.orm import Session
+
+from models.models import Table, QueueEntry, TableStatus, TableTurnover, FloorEventKind
+from models.records import TableRecord
+from models.schemas import TableCreate, TableBulkUpdate, QueueEntryCreate
+from services.events import table_event, queue_event, add_events
+
+# Largest batch one request may carry
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+
+class BulkResult:
+    """
+    Outcome of a batch: one result per input item, in input order, plus
+    the committed rows the caller writes through to the floor cache
+    """
+
+    def __init__(self, size: int):
+        self.items: List[Optional[Dict[str, Any]]] = [None] * size
+        self.tables: List[Any] = []
+        self.entries: List[QueueEntry] = []
+        self.turnovers: List[Dict[str, Any]] = []
+        self.events: List[Any] = []
+
+    def ok(self, index: int, status: str, row_id: int) -> None:
+        self.items[index] = {"index": index, "status": status, "id": row_id}
+
+    def error(self, index: int, message: str) -> None:
+        self.items[index] = {"index": index, "status": "error", "error": message}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "results": self.items,
+            "succeeded": sum(1 for item in self.items if item["status"] != "error"),
+            "failed": sum(1 for item in self.items if item["status"] == "error")
+        }
+
+def _validate(schema, items: List[Dict[str, Any]], result: BulkResult) -> List[Tuple[int, BaseModel]]:
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            result.error(index, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ))
+    return valid
+
+def _table_status(value: str) -> TableStatus:
+    try:
+        return TableStatus(value)
+    except ValueError:
+        raise ValueError(f"Unknown status '{value}' (expected one of "
+                         f"{', '.join(status.value for status in TableStatus)})")
+
+def _table_record(table: Table, changes: Dict[str, Any]) -> TableRecord:
+    """
+    The table's columns after a bulk UPDATE, which does not refresh the
+    loaded ORM row
+    """
+    return TableRecord(*(changes.get(name, getattr(table, name)) for name in TableRecord._fields))
+
+def _transition(table: Table, status: TableStatus, now: datetime,
+                result: BulkResult, fields: Optional[Dict[str, Any]] = None,
+                restart: bool = True) -> Dict[str, Any]:
+    """
+    Row mapping of one table's status change, following update_table:
+    occupying starts the clock (restart=False leaves a table that stays
+    occupied alone), and freeing an occupied table records its turnover
+    """
+    mapping = {"id": table.id, "status": status, "updated_at": now, **(fields or {})}
+    if status != TableStatus.OCCUPIED:
+        mapping["occupied_since"] = None
+    elif restart or table.status != TableStatus.OCCUPIED:
+        mapping["occupied_since"] = now
+    else:
+        mapping["occupied_since"] = table.occupied_since
+
+    duration = None
+    if (table.status == TableStatus.OCCUPIED and table.occupied_since
+            and status != TableStatus.OCCUPIED):
+        duration = (now - table.occupied_since).total_seconds() / 60
+        result.turnovers.append({
+            "table_id": table.id,
+            "capacity": table.capacity,
+            "occupied_at": table.occupied_since,
+            "freed_at": now,
+            "duration_minutes": duration
+        })
+
+    record = _table_record(table, mapping)
+    if table.status != status:
+        result.events.append(table_event(record, table.status, now, duration))
+    result.tables.append(record)
+    return mapping
+
+def _write_updates(db: Session, mappings: List[Dict[str, Any]], result: BulkResult) -> None:
+    # One executemany UPDATE by primary key, and the turnovers it completed
+    db.execute(update(Table), mappings)
+    if result.turnovers:
+        db.execute(insert(TableTurnover), result.turnovers)
+
+def _commit(db: Session, result: BulkResult) -> None:
+    add_events(db, result.events)
+    db.commit()
+
+def create_tables(db: Session, items: List[Dict[str, Any]], upsert: bool = False,
+                  now: Optional[datetime] = None) -> BulkResult:
+    """
+    Insert a batch of tables. With upsert, tables whose number already
+    exists are updated to the given layout instead (a floor import);
+    otherwise they are reported as errors.
+    """
+    now = now or datetime.utcnow()
+    result = BulkResult(len(items))
+
+    numbers: Dict[str, int] = {}
+    valid: List[Tuple[int, TableCreate, TableStatus]] = []
+    for index, table in _validate(TableCreate, items, result):
+        try:
+            status = _table_status(table.status)
+        except ValueError as e:
+            result.error(index, str(e))
+            continue
+        if table.capacity < 1:
+            result.error(index, "capacity must be at least 1")
+        elif table.number in numbers:
+            result.error(index, f"Table {table.number} appears more than once in this batch "
+                                f"(first at index {numbers[table.number]})")
+        else:
+            numbers[table.number] = index
+            valid.append((index, table, status))
+
+    existing = {
+        table.number: table
+        for table in db.execute(select(Table).where(Table.number.in_(list(numbers)))).scalars()
+    } if numbers else {}
+
+    creates, updates = [], []
+    for index, table, status in valid:
+        current = existing.get(table.number)
+        if current is None:
+            creates.append((index, table, status))
+        elif upsert:
+            updates.append((index, table, status, current))
+        else:
+            result.error(index, f"Table {table.number} already exists")
+
+    if creates:
+        # One multi-row INSERT ... RETURNING; rows come back keyed by number
+        rows = db.execute(
+            insert(Table).returning(Table),
+            [
+                {
+                    "number": table.number,
+                    "capacity": table.capacity,
+                    "status": status,
+                    "location": table.location,
+                    "zone": table.zone,
+                    "occupied_since": now if status == TableStatus.OCCUPIED else None,
+                    "updated_at": now
+                }
+                for _, table, status in creates
+            ]
+        ).scalars().all()
+        created = {row.number: row for row in rows}
+        for index, table, _ in creates:
+            row = created[table.number]
+            result.events.append(table_event(row, None, now))
+            result.tables.append(row)
+            result.ok(index, "created", row.id)
+
+    if updates:
+        mappings = [
+            _transition(current, status, now, result, {
+                "capacity": table.capacity, "location": table.location, "zone": table.zone
+            }, restart=False)
+            for _, table, status, current in updates
+        ]
+        _write_updates(db, mappings, result)
+        for index, _, _, current in updates:
+            result.ok(index, "updated", current.id)
+
+    _commit(db, result)
+    return result
+
+def update_table_statuses(db: Session, items: List[Dict[str, Any]],
+                          now: Optional[datetime] = None) -> BulkResult:
+    """
+    Set the status of a batch of tables (e.g. clearing the floor at shift
+    change) with one multi-row UPDATE
+    """
+    now = now or datetime.utcnow()
+    result = BulkResult(len(items))
+
+    ids: Dict[int, int] = {}
+    valid: List[Tuple[int, TableBulkUpdate, TableStatus]] = []
+    for index, item in _validate(TableBulkUpdate, items, result):
+        try:
+            status = _table_status(item.status)
+        except ValueError as e:
+            result.error(index, str(e))
+            continue
+        if item.id in ids:
+            result.error(index, f"Table {item.id} appears more than once in this batch "
+                                f"(first at index {ids[item.id]})")
+        else:
+            ids[item.id] = index
+            valid.append((index, item, status))
+
+    tables = {
+        table.id: table
+        for table in db.execute(select(Table).where(Table.id.in_(list(ids)))).scalars()
+    } if ids else {}
+
+    mappings = []
+    for index, item, status in valid:
+        table = tables.get(item.id)
+        if table is None:
+            result.error(index, "Table not found")
+            continue
+        mappings.append(_transition(table, status, now, result))
+        result.ok(index, "updated", table.id)
+
+    if mappings:
+        _write_updates(db, mappings, result)
+    _commit(db, result)
+    return result
+
+def join_queue_bulk(db: Session, items: List[Dict[str, Any]],
+                    now: Optional[datetime] = None) -> BulkResult:
+    """
+    Add a batch of parties to their queues with one multi-row INSERT. They
+    share a join time, so they line up in input order.
+    """
+    now = now or datetime.utcnow()
+    result = BulkResult(len(items))
+
+    valid = []
+    for index, entry in _validate(QueueEntryCreate, items, result):
+        if entry.party_size < 1:
+            result.error(index, "party_size must be at least 1")
+        else:
+            valid.append((index, entry))
+
+    if valid:
+        # One multi-row INSERT ... RETURNING. Ids are assigned in VALUES
+        # order, so sorting by id lines the rows up with the input.
+        rows = db.execute(
+            insert(QueueEntry).returning(QueueEntry),
+            [
+                dict(entry.dict(), estimated_wait_time=15, joined_at=now, notified=0)
+                for _, entry in valid
+            ]
+        ).scalars().all()
+        for (index, _), row in zip(valid, sorted(rows, key=lambda row: row.id)):
+            result.events.append(queue_event(FloorEventKind.QUEUE_JOIN, row, now))
+            result.entries.append(row)
+            result.ok(index, "created", row.id)
+    _commit(db, result)
+    return result
@@ -0,0 +1,157 @@
+"""
+Floor Events - Append-only history of tables and the queue, and its export
+Endpoints and orchestration cycles add FloorEvent rows in the same
+transaction as the change they describe. Exports walk the log in id
+order one page at a time, each page on a short-lived connection, so
+dumping millions of events keeps memory and lock time constant.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+
+from database.db import engine
+from models.models import FloorEvent, FloorEventKind
+
+# Rows read per page of an export
+EVENT_EXPORT_BATCH_SIZE = int(os.getenv("EVENT_EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = (
+    "id", "kind", "location", "zone", "table_id", "queue_entry_id", "party_size",
+    "from_status", "to_status", "duration_minutes", "wait_minutes", "created_at"
+)
+_SELECT_COLUMNS = [getattr(FloorEvent.__table__.c, name) for name in EXPORT_COLUMNS]
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+def table_event(table, from_status, now: datetime,
+                duration_minutes: Optional[float] = None) -> FloorEvent:
+    """
+    A table's move from from_status (None when it was just created) to
+    its current status
+    """
+    return FloorEvent(
+        kind=FloorEventKind.TABLE_STATUS.value,
+        location=table.location,
+        zone=table.zone,
+        table_id=table.id,
+        party_size=table.capacity,
+        from_status=_status_value(from_status),
+        to_status=_status_value(table.status),
+        duration_minutes=duration_minutes,
+        created_at=now
+    )
+
+def queue_event(kind: FloorEventKind, entry, now: datetime,
+                table_id: Optional[int] = None) -> FloorEvent:
+    """
+    A party joining, being matched to a table, being seated or leaving.
+    Seat and leave events carry how long the party waited.
+    """
+    wait_minutes = None
+    if kind in (FloorEventKind.QUEUE_SEAT, FloorEventKind.QUEUE_LEAVE) and entry.joined_at:
+        wait_minutes = (now - entry.joined_at).total_seconds() / 60
+    return FloorEvent(
+        kind=kind.value,
+        location=entry.location,
+        zone=entry.zone,
+        table_id=table_id,
+        queue_entry_id=entry.id,
+        party_size=entry.party_size,
+        wait_minutes=wait_minutes,
+        created_at=now
+    )
+
+def add_events(db: Session, events: List[FloorEvent]) -> None:
+    """
+    Insert a batch of events with one executemany INSERT. Unlike
+    Session.add_all, no ids are fetched back row by row. Does not commit.
+    """
+    if events:
+        db.execute(insert(FloorEvent), [
+            {column.key: getattr(event, column.key)
+             for column in FloorEvent.__table__.columns if column.key != "id"}
+            for event in events
+        ])
+
+# ============= EXPORT =============
+
+def _events_query(after: int, kinds: Optional[Sequence[str]], since: Optional[datetime],
+                  until: Optional[datetime], limit: int):
+    query = select(*_SELECT_COLUMNS).where(FloorEvent.id > after)
+    if kinds:
+        query = query.where(FloorEvent.kind.in_(list(kinds)))
+    if since is not None:
+        query = query.where(FloorEvent.created_at >= since)
+    if until is not None:
+        query = query.where(FloorEvent.created_at < until)
+    return query.order_by(FloorEvent.id).limit(limit)
+
+def read_events(after: int = 0, kinds: Optional[Sequence[str]] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                limit: int = EVENT_EXPORT_BATCH_SIZE, bind=None) -> List[tuple]:
+    """
+    One page of events with id > after, in id order, as EXPORT_COLUMNS tuples
+    """
+    with (bind or engine).connect() as connection:
+        return [tuple(row) for row in connection.execute(
+            _events_query(after, kinds, since, until, limit))]
+
+def iter_event_pages(after: int = 0, kinds: Optional[Sequence[str]] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     limit: Optional[int] = None, batch_size: int = EVENT_EXPORT_BATCH_SIZE,
+                     bind=None) -> Iterator[List[tuple]]:
+    """
+    Pages of events after the cursor until the log (or limit) runs out.
+    Events appended during the export are included if they land before
+    it finishes.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        page = read_events(after, kinds, since, until, size, bind)
+        if not page:
+            return
+        yield page
+        if len(page) < size:
+            return
+        after = page[-1][0]
+        if remaining is not None:
+            remaining -= len(page)
+
+def event_record(row: Sequence[Any]) -> Dict[str, Any]:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    if record["created_at"] is not None:
+        record["created_at"] = record["created_at"].isoformat()
+    return record
+
+def ndjson_chunks(pages: Iterable[List[tuple]]) -> Iterator[str]:
+    """
+    One chunk of newline-delimited JSON per page
+    """
+    for page in pages:
+        yield "".join(json.dumps(event_record(row), separators=(",", ":")) + "\n"
+                      for row in page)
+
+def csv_chunks(pages: Iterable[List[tuple]]) -> Iterator[str]:
+    """
+    A header line, then one chunk of CSV per page
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in page
+        )
+        yield buffer.getvalue()
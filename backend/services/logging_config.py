@@ -0,0 +1,82 @@
+"""
+Logging - Non-blocking output, per-agent levels and per-cycle sampling
+Records are put on a queue by a QueueHandler and written out by a
+QueueListener thread, so agents and request handlers never wait on
+stderr. Each agent logs to its own "agents.<Name>" logger, whose level
+can be set separately, and its per-cycle messages can be sampled.
+"""
+import atexit
+import itertools
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Per-agent overrides, e.g. "TableAgent=DEBUG,ETAAgent=WARNING"
+AGENT_LOG_LEVELS = os.getenv("AGENT_LOG_LEVELS", "")
+# Per-cycle agent messages are logged for 1 in every N runs of each agent
+LOG_CYCLE_SAMPLE = int(os.getenv("LOG_CYCLE_SAMPLE", "1"))
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+def agent_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"agents.{name}")
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+def configure_logging(level: str = LOG_LEVEL, agent_levels: str = AGENT_LOG_LEVELS) -> QueueListener:
+    """
+    Route the root logger through a queue. Handlers already installed
+    (e.g. by a test runner) move behind the listener; otherwise records
+    go to stderr. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    if not handlers:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [stream]
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+    for name, agent_level in parse_levels(agent_levels).items():
+        agent_logger(name).setLevel(agent_level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging() -> None:
+    """
+    Write out what is still queued and stop the listener thread
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class CycleSampler:
+    """
+    True for 1 in every `every` calls, starting with the first
+    """
+
+    def __init__(self, every: int = LOG_CYCLE_SAMPLE):
+        self.every = max(1, every)
+        self._calls = itertools.count()
+
+    def __call__(self) -> bool:
+        return next(self._calls) % self.every == 0
@@ -0,0 +1,223 @@
+"""
+Metrics - Low-overhead timers, counters and gauges
+Agents, cycles and endpoints record into the process-wide `metrics`
+registry, which renders them in the Prometheus text format for
+/metrics and keeps a ring buffer of recent cycle traces. With
+METRICS_ENABLED=false every recording call returns straight away.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Cycle traces kept for /api/metrics/traces
+METRICS_TRACE_LIMIT = int(os.getenv("METRICS_TRACE_LIMIT", "50"))
+
+# Seconds; spans sub-millisecond agent phases up to slow cycles
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+clock = time.perf_counter
+
+LabelValues = Tuple[str, ...]
+
+def _escape_label(value: Any) -> str:
+    """
+    Label value as the Prometheus text format requires: backslash,
+    double quote and newline escaped
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {total:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    bucket_labels = _format_labels(self.labels, values, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                labels = _format_labels(self.labels, values)
+                lines.append(f"{self.name}_sum{labels} {total:.6f}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Gauge:
+    """
+    Read when scraped, so keeping it current costs nothing in between
+    """
+
+    def __init__(self, name: str, help: str, read: Callable[[], Any],
+                 labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        # Returns a number, or {label values: number} for labelled gauges
+        self.read = read
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        value = self.read()
+        if isinstance(value, dict):
+            for values, number in sorted(value.items()):
+                values = values if isinstance(values, tuple) else (values,)
+                lines.append(f"{self.name}{_format_labels(self.labels, values)} {number:g}")
+        else:
+            lines.append(f"{self.name} {value:g}")
+        return lines
+
+class PhaseTimer:
+    """
+    Laps of one agent run: sense, decide, act
+    """
+    __slots__ = ("registry", "agent", "start", "last", "phases")
+
+    def __init__(self, registry: "MetricsRegistry", agent: str):
+        self.registry = registry
+        self.agent = agent
+        self.start = self.last = clock()
+        self.phases: Dict[str, float] = {}
+
+    def lap(self, phase: str) -> None:
+        now = clock()
+        elapsed = now - self.last
+        self.last = now
+        self.phases[phase] = elapsed
+        self.registry.agent_phase_seconds.observe(elapsed, self.agent, phase)
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Record the whole run; returns the phase timings in milliseconds
+        """
+        total = self.last - self.start
+        self.registry.agent_run_seconds.observe(total, self.agent)
+        timings = {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()}
+        timings["total"] = round(total * 1000, 3)
+        return timings
+
+class MetricsRegistry:
+    """
+    The process's metrics and recent cycle traces
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, trace_limit: int = METRICS_TRACE_LIMIT):
+        self.enabled = enabled
+        self.traces: deque = deque(maxlen=trace_limit)
+        self._metrics: List[Any] = []
+        self._gauge_lock = threading.Lock()
+
+        self.agent_run_seconds = self.register(Histogram(
+            "agent_run_seconds", "Duration of one agent run", ("agent",)))
+        self.agent_phase_seconds = self.register(Histogram(
+            "agent_phase_seconds", "Duration of an agent's sense, decide and act phases",
+            ("agent", "phase")))
+        self.cycle_seconds = self.register(Histogram(
+            "orchestration_cycle_seconds", "Duration of one zone's orchestration cycle",
+            ("mode",)))
+        self.writeback_seconds = self.register(Histogram(
+            "orchestration_writeback_seconds",
+            "Duration of a cycle's database write-back (outbox and ETAs)"))
+        self.cycles_total = self.register(Counter(
+            "orchestration_cycles_total", "Zone orchestration cycles run", ("mode",)))
+        self.request_seconds = self.register(Histogram(
+            "http_request_duration_seconds", "Duration of HTTP requests by route",
+            ("method", "route")))
+        self.requests_total = self.register(Counter(
+            "http_requests_total", "HTTP requests by route and status",
+            ("method", "route", "status")))
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, read: Callable[[], Any],
+              labels: Tuple[str, ...] = ()) -> Gauge:
+        with self._gauge_lock:
+            self._metrics = [m for m in self._metrics if m.name != name]
+            return self.register(Gauge(name, help, read, labels))
+
+    def phase_timer(self, agent: str) -> Optional[PhaseTimer]:
+        """
+        A timer for one agent run, or None when metrics are disabled
+        """
+        return PhaseTimer(self, agent) if self.enabled else None
+
+    def record_cycle(self, trace: Dict[str, Any], seconds: float, writeback_seconds: float) -> None:
+        if not self.enabled:
+            return
+        mode = "full" if trace.get("full") else "incremental"
+        self.cycle_seconds.observe(seconds, mode)
+        self.writeback_seconds.observe(writeback_seconds)
+        self.cycles_total.inc(mode)
+        self.traces.append(trace)
+
+    def record_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        if not self.enabled:
+            return
+        self.request_seconds.observe(seconds, method, route)
+        self.requests_total.inc(method, route, str(status))
+
+    def recent_traces(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Most recent cycle traces, newest first
+        """
+        traces = list(self.traces)[::-1]
+        return traces[:limit] if limit is not None else traces
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
@@ -0,0 +1,356 @@
+"""
+Notification Outbox - Durable, batched delivery of agent notifications
+Orchestration cycles only enqueue rows into the notifications table, in
+the same transaction as their other writes. A background worker claims
+due rows in batches, hands them to a pluggable sender and retries
+failures with exponential backoff. A batch is claimed with one atomic
+UPDATE before it is sent, so concurrent workers never send the same row.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+import os
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import select, delete, insert, update
+from sqlalchemy.orm import Session
+
+from database.db import SessionLocal
+from models.models import Notification, NotificationStatus
+
+logger = logging.getLogger(__name__)
+
+# Which sender delivers notifications (see SENDERS)
+NOTIFICATION_SENDER = os.getenv("NOTIFICATION_SENDER", "log")
+# Rows handed to the sender per batch
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+# How often the worker polls for due retries when nothing wakes it
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "5"))
+# Attempts before a notification is marked failed, and the first retry delay
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_RETRY_SECONDS = float(os.getenv("NOTIFICATION_RETRY_SECONDS", "5"))
+NOTIFICATION_MAX_RETRY_SECONDS = 300
+# A claimed batch not settled within this long (its worker died) is claimed again
+NOTIFICATION_CLAIM_SECONDS = float(os.getenv("NOTIFICATION_CLAIM_SECONDS", "60"))
+# The same (type, recipient, table) in one zone is sent at most once per window
+NOTIFICATION_DEDUP_WINDOW_MINUTES = int(os.getenv("NOTIFICATION_DEDUP_WINDOW_MINUTES", "15"))
+# Delivered notifications kept in memory for the UI
+NOTIFICATION_RECENT_LIMIT = int(os.getenv("NOTIFICATION_RECENT_LIMIT", "100"))
+# Delivered and failed rows older than this are pruned from the outbox
+NOTIFICATION_RETENTION_HOURS = int(os.getenv("NOTIFICATION_RETENTION_HOURS", "24"))
+
+def dedup_key(item: Dict[str, Any], zone: Tuple[str, str], now: datetime,
+              window_minutes: int = NOTIFICATION_DEDUP_WINDOW_MINUTES) -> str:
+    """
+    Outbox key of a notification: its type, location, zone, recipient and
+    table, plus the time window it falls in. Table numbers repeat across
+    zones, so the zone is part of the key.
+    """
+    window = int(now.timestamp() // (window_minutes * 60))
+    location, zone_name = zone
+    return (f"{item['type']}|{location}|{zone_name}|{item.get('recipient')}"
+            f"|{item.get('table_number')}|{window}")
+
+def enqueue_notifications(db: Session, items: List[Dict[str, Any]],
+                          zone: Tuple[str, str], now: Optional[datetime] = None) -> int:
+    """
+    Add outbox rows for the items not already queued in their dedup
+    window. Does not commit: the rows go out with the caller's
+    transaction. Returns the number of rows added.
+    """
+    if not items:
+        return 0
+    now = now or datetime.utcnow()
+
+    # Later duplicates within one batch collapse onto the first
+    keyed: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        keyed.setdefault(dedup_key(item, zone, now), item)
+
+    existing = set(db.execute(
+        select(Notification.dedup_key).where(Notification.dedup_key.in_(list(keyed)))
+    ).scalars())
+    rows = [
+        {
+            "type": item["type"],
+            "recipient": item.get("recipient"),
+            "contact": item.get("contact"),
+            "message": item["message"],
+            "priority": item.get("priority"),
+            "table_number": item.get("table_number"),
+            "location": zone[0],
+            "zone": zone[1],
+            "dedup_key": key,
+            "status": NotificationStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        }
+        for key, item in keyed.items() if key not in existing
+    ]
+    if rows:
+        # One executemany INSERT; the ids are not needed back
+        db.execute(insert(Notification), rows)
+    return len(rows)
+
+# ============= SENDERS =============
+
+class NotificationSender(ABC):
+    """
+    Abstract base class for notification delivery channels
+    """
+    name = "base"
+
+    @abstractmethod
+    def send_batch(self, notifications: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Deliver a batch. Returns the ids that failed, with their error;
+        raising fails the whole batch.
+        """
+        pass
+
+class LogSender(NotificationSender):
+    """
+    Local stub: logs every notification and keeps the delivered ones,
+    for development and tests
+    """
+    name = "log"
+
+    def __init__(self, keep: int = 1000):
+        self.delivered: deque = deque(maxlen=keep)
+
+    def send_batch(self, notifications: List[Dict[str, Any]]) -> Dict[int, str]:
+        for notification in notifications:
+            logger.info("[NOTIFICATION SENT] To: %s | Msg: %s",
+                        notification["recipient"], notification["message"])
+            self.delivered.append(notification)
+        return {}
+
+SENDERS: Dict[str, Callable[[], NotificationSender]] = {
+    "log": LogSender
+}
+
+def build_sender(name: str = NOTIFICATION_SENDER) -> NotificationSender:
+    if name not in SENDERS:
+        raise ValueError(f"Unknown NOTIFICATION_SENDER '{name}' (expected one of {sorted(SENDERS)})")
+    return SENDERS[name]()
+
+def serialize_notification(row: Notification) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "type": row.type,
+        "recipient": row.recipient,
+        "contact": row.contact,
+        "message": row.message,
+        "priority": row.priority,
+        "table_number": row.table_number,
+        "location": row.location,
+        "zone": row.zone,
+        "created_at": row.created_at.isoformat() if row.created_at else None
+    }
+
+# ============= WORKER =============
+
+class NotificationWorker:
+    """
+    Background delivery of the outbox. Woken when a cycle queues
+    notifications, and polls on its own for retries that come due.
+    """
+
+    def __init__(self, sender: Optional[NotificationSender] = None,
+                 session_factory=SessionLocal,
+                 batch_size: int = NOTIFICATION_BATCH_SIZE,
+                 poll_seconds: float = NOTIFICATION_POLL_SECONDS,
+                 max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+                 retry_seconds: float = NOTIFICATION_RETRY_SECONDS,
+                 claim_seconds: float = NOTIFICATION_CLAIM_SECONDS,
+                 recent_limit: int = NOTIFICATION_RECENT_LIMIT):
+        self.sender = sender or build_sender()
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.claim_seconds = claim_seconds
+        # Most recent deliveries, newest last, for the UI
+        self.recent: deque = deque(maxlen=recent_limit)
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._last_prune: Optional[datetime] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Start delivering on the running event loop
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._wake.set()  # deliver whatever an earlier run left pending
+        self._task = asyncio.create_task(self._run())
+        logger.info("NotificationWorker started (sender: %s)", self.sender.name)
+
+    async def stop(self) -> None:
+        """
+        Stop the worker, delivering what is due first
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self.drain)
+        logger.info("NotificationWorker stopped")
+
+    def wake(self, *_) -> None:
+        """
+        Deliver soon; safe to call from any thread
+        """
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.drain)
+            except Exception:
+                logger.exception("Notification delivery failed")
+
+    def drain(self) -> int:
+        """
+        Deliver batches until nothing is due. Returns the rows processed.
+        """
+        total = 0
+        while True:
+            processed = self.deliver_batch()
+            total += processed
+            if processed < self.batch_size:
+                break
+        self.prune()
+        return total
+
+    def claim_batch(self, db: Session, now: datetime) -> List[Notification]:
+        """
+        Claim up to batch_size due rows for this worker and return them.
+        One UPDATE marks them sending under a fresh token, and re-checks
+        their status, so a row another worker claimed first is skipped.
+        Rows left sending past their claim (a worker that died mid-batch)
+        are due again.
+        """
+        token = uuid.uuid4().hex
+        claimable = (Notification.status.in_((NotificationStatus.PENDING, NotificationStatus.SENDING)),
+                     Notification.next_attempt_at <= now)
+        due = (
+            select(Notification.id)
+            .where(*claimable)
+            .order_by(Notification.next_attempt_at, Notification.id)
+            .limit(self.batch_size)
+        )
+        db.execute(
+            update(Notification)
+            .where(Notification.id.in_(due), *claimable)
+            .values(status=NotificationStatus.SENDING, claim_token=token,
+                    next_attempt_at=now + timedelta(seconds=self.claim_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return db.execute(
+            select(Notification)
+            .where(Notification.claim_token == token)
+            .order_by(Notification.id)
+        ).scalars().all()
+
+    def deliver_batch(self, now: Optional[datetime] = None) -> int:
+        """
+        Claim and send one batch of due notifications and record the
+        outcome of each: sent, retried later with backoff, or failed for
+        good
+        """
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            rows = self.claim_batch(db, now)
+            if not rows:
+                return 0
+
+            payloads = [serialize_notification(row) for row in rows]
+            try:
+                errors = self.sender.send_batch(payloads)
+            except Exception as exc:
+                logger.warning("Notification sender '%s' failed: %s", self.sender.name, exc)
+                errors = {row.id: str(exc) for row in rows}
+
+            for row, payload in zip(rows, payloads):
+                row.attempts = (row.attempts or 0) + 1
+                row.claim_token = None
+                error = errors.get(row.id)
+                if error is None:
+                    row.status = NotificationStatus.SENT
+                    row.sent_at = now
+                    row.last_error = None
+                    self.recent.append(dict(payload, sent_at=now.isoformat()))
+                    self.sent += 1
+                elif row.attempts >= self.max_attempts:
+                    row.status = NotificationStatus.FAILED
+                    row.last_error = error
+                    self.failed += 1
+                else:
+                    delay = min(self.retry_seconds * 2 ** (row.attempts - 1),
+                                NOTIFICATION_MAX_RETRY_SECONDS)
+                    row.status = NotificationStatus.PENDING
+                    row.next_attempt_at = now + timedelta(seconds=delay)
+                    row.last_error = error
+                    self.retried += 1
+            db.commit()
+            return len(rows)
+        finally:
+            db.close()
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete delivered and failed rows past the retention period, at
+        most once an hour
+        """
+        now = now or datetime.utcnow()
+        if self._last_prune is not None and now - self._last_prune < timedelta(hours=1):
+            return 0
+        self._last_prune = now
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                delete(Notification)
+                .where(Notification.status.in_((NotificationStatus.SENT, NotificationStatus.FAILED)),
+                       Notification.created_at < now - timedelta(hours=NOTIFICATION_RETENTION_HOURS))
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sender": self.sender.name,
+            "running": self.running,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed
+        }
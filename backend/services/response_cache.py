@@ -0,0 +1,102 @@
+"""
+Response Cache - Encoded JSON bodies for the list endpoints
+Each entry is stored with the floor version it was built from, so any
+write that bumps that version invalidates it; hits return the bytes
+as they are, without going through Pydantic again. Bodies that are
+expensive to build can be built once per version for every concurrent
+caller (get_or_build).
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dataclasses import dataclass
+
+@dataclass
+class CachedBody:
+    version: int
+    body: bytes
+    expires_at: Optional[float] = None
+
+def encode_json(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class ResponseCache:
+    """
+    Version-keyed store of encoded response bodies with hit/miss counters
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedBody] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        # Callers that waited on another caller's build instead of their own
+        self.shared: Dict[str, int] = {}
+        # Key -> (version, build in progress)
+        self._building: Dict[str, Tuple[int, asyncio.Future]] = {}
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        """
+        Return the body cached for `key` if it was built at `version`
+        and has not expired
+        """
+        entry = self._entries.get(key)
+        if (entry is not None and entry.version == version
+                and (entry.expires_at is None or entry.expires_at > time.monotonic())):
+            self.hits[key] = self.hits.get(key, 0) + 1
+            return entry.body
+        self.misses[key] = self.misses.get(key, 0) + 1
+        return None
+
+    def put(self, key: str, version: int, body: bytes,
+            max_age: Optional[float] = None) -> bytes:
+        """
+        Store a body built at `version`. Callers must read the version
+        before building the body, so a concurrent write can only leave
+        an entry that is already invalid.
+        """
+        expires_at = time.monotonic() + max_age if max_age is not None else None
+        self._entries[key] = CachedBody(version=version, body=body, expires_at=expires_at)
+        return body
+
+    async def get_or_build(self, key: str, version: int, build: Callable[[], Awaitable[bytes]],
+                           max_age: Optional[float] = None) -> bytes:
+        """
+        The body cached for `key` at `version`, or the one `build` makes.
+        Concurrent callers that miss the same key and version share a
+        single build; a caller that disconnects does not cancel it for
+        the others.
+        """
+        body = self.get(key, version)
+        if body is not None:
+            return body
+        building = self._building.get(key)
+        if building is not None and building[0] == version:
+            self.shared[key] = self.shared.get(key, 0) + 1
+            return await asyncio.shield(building[1])
+
+        async def build_and_store() -> bytes:
+            try:
+                return self.put(key, version, await build(), max_age=max_age)
+            finally:
+                if self._building.get(key, (None, None))[1] is task:
+                    del self._building[key]
+
+        task = asyncio.ensure_future(build_and_store())
+        self._building[key] = (version, task)
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        keys = sorted(set(self.hits) | set(self.misses) | set(self.shared))
+        return {
+            key: {
+                "hits": self.hits.get(key, 0),
+                "misses": self.misses.get(key, 0),
+                "shared": self.shared.get(key, 0),
+                "cached": key in self._entries
+            }
+            for key in keys
+        }
@@ -0,0 +1,159 @@
+"""
+Orchestration Scheduler - Runs agent cycles off the request path
+Writes mark the floor dirty; a background task coalesces bursts of
+writes into one orchestration cycle per debounce window. A second task
+sleeps until the next occupied table turns stale and runs a cycle then,
+so stale-table alerts do not wait for an unrelated write.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from database.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Debounce window for coalescing writes into one cycle, in milliseconds
+ORCHESTRATION_DEBOUNCE_MS = int(os.getenv("ORCHESTRATION_DEBOUNCE_MS", "250"))
+
+class OrchestrationScheduler:
+    """
+    Debounced background scheduler for AgentOrchestrator.run_cycle
+    """
+
+    def __init__(self, orchestrator, session_factory=SessionLocal,
+                 debounce_ms: int = ORCHESTRATION_DEBOUNCE_MS):
+        self.orchestrator = orchestrator
+        self.session_factory = session_factory
+        self.debounce_seconds = debounce_ms / 1000
+        self.cycles_run = 0
+        self.last_result: Optional[Dict[str, Any]] = None
+        self._dirty: Optional[asyncio.Event] = None
+        self._waiters: List[asyncio.Future] = []
+        self._full_requested = False
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._deadline_moved: Optional[asyncio.Event] = None
+        self._deadline_task: Optional[asyncio.Task] = None
+        self.deadline_ticks = 0
+        orchestrator.floor.add_deadline_listener(self._on_deadline_moved)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Start the background loop on the running event loop
+        """
+        if self.running:
+            return
+        self._dirty = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._deadline_moved = asyncio.Event()
+        self._task = asyncio.create_task(self._run_loop())
+        self._deadline_task = asyncio.create_task(self._deadline_loop())
+        logger.info("OrchestrationScheduler started (%.0f ms debounce)", self.debounce_seconds * 1000)
+
+    async def stop(self) -> None:
+        """
+        Stop the background loop, running one last cycle for pending writes
+        """
+        if not self.running:
+            return
+        for task in (self._deadline_task, self._task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._deadline_task = None
+        if self._dirty.is_set() or self._waiters:
+            await self._run_batch()
+        # Anyone who started waiting during that last cycle gets an answer too
+        waiters, self._waiters = self._waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_exception(RuntimeError("Orchestration scheduler stopped"))
+        logger.info("OrchestrationScheduler stopped")
+
+    def mark_dirty(self) -> None:
+        """
+        Record that the floor changed; a cycle will run after the debounce window
+        """
+        if self._dirty is not None:
+            self._dirty.set()
+
+    async def wait_for_cycle(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Mark the floor dirty and wait for the cycle that covers this write.
+        full=True makes that cycle recompute every agent from scratch.
+        """
+        if not self.running:
+            # No background loop (e.g. scheduler never started): run inline
+            return await asyncio.to_thread(self._run_cycle, full)
+        
+        self._full_requested = self._full_requested or full
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.mark_dirty()
+        return await future
+
+    async def _run_loop(self) -> None:
+        while True:
+            await self._dirty.wait()
+            # Let the burst settle so it is covered by a single cycle
+            await asyncio.sleep(self.debounce_seconds)
+            await self._run_batch()
+
+    def _on_deadline_moved(self, deadline: datetime) -> None:
+        # Called by the floor, from any thread, when an earlier deadline appears
+        if self._loop is not None and self._deadline_moved is not None:
+            self._loop.call_soon_threadsafe(self._deadline_moved.set)
+
+    async def _deadline_loop(self) -> None:
+        floor = self.orchestrator.floor
+        while True:
+            # Cleared before reading, so a deadline added meanwhile wakes us
+            self._deadline_moved.clear()
+            deadline = floor.next_deadline()
+            timeout = None if deadline is None else max(0.0, (deadline - datetime.utcnow()).total_seconds())
+            try:
+                await asyncio.wait_for(self._deadline_moved.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.deadline_ticks += 1
+                if floor.expire_due():
+                    self.mark_dirty()
+
+    async def _run_batch(self) -> None:
+        self._dirty.clear()
+        waiters, self._waiters = self._waiters, []
+        full, self._full_requested = self._full_requested, False
+        
+        try:
+            result = await asyncio.to_thread(self._run_cycle, full)
+        except asyncio.CancelledError:
+            # Stopped mid-cycle: hand the waiters back so stop()'s final
+            # cycle (or the next start) answers them
+            self._waiters[:0] = waiters
+            self._full_requested = self._full_requested or full
+            raise
+        except Exception as exc:
+            logger.exception("Scheduled orchestration cycle failed")
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        
+        for future in waiters:
+            if not future.done():
+                future.set_result(result)
+
+    def _run_cycle(self, full: bool = False) -> Dict[str, Any]:
+        # Zones changed in this batch run in parallel, each on its own session
+        result = self.orchestrator.run_pending(self.session_factory, full=full)
+        self.cycles_run += 1
+        self.last_result = result
+        return result
@@ -0,0 +1,119 @@
+import { useState, useEffect, useCallback } from 'react'
+
+const API_BASE = 'http://localhost:8000'
+const FEED_URL = `${API_BASE.replace(/^http/, 'ws')}/ws/floor`
+const MAX_RETRY_DELAY = 30000
+// Give up waiting for a socket that neither opens nor fails
+const CONNECT_TIMEOUT = 10000
+
+const upsertById = (rows, row) => {
+    const index = rows.findIndex(r => r.id === row.id)
+    if (index === -1) return [...rows, row]
+    const next = [...rows]
+    next[index] = row
+    return next
+}
+
+const zoneKey = e => `${e.location}/${e.zone}`
+
+// Queue order is fixed at join time; positions are each entry's place in
+// its zone and are re-derived here whenever someone joins or leaves
+const ordered = rows => {
+    const sorted = [...rows].sort((a, b) =>
+        zoneKey(a).localeCompare(zoneKey(b)) ||
+        a.joined_at.localeCompare(b.joined_at) ||
+        a.id - b.id)
+    const counts = {}
+    return sorted.map(e => {
+        const key = zoneKey(e)
+        counts[key] = (counts[key] || 0) + 1
+        return e.position === counts[key] ? e : { ...e, position: counts[key] }
+    })
+}
+
+// Live tables and queue from the /ws/floor push channel: one snapshot on
+// connect, then diff events. Reconnects with backoff if the socket drops;
+// `error` is set while the feed is unreachable.
+function useFloorFeed() {
+    const [tables, setTables] = useState([])
+    const [queue, setQueue] = useState([])
+    const [loading, setLoading] = useState(true)
+    const [connected, setConnected] = useState(false)
+    const [error, setError] = useState(null)
+    const [generation, setGeneration] = useState(0)
+
+    const applyEvent = useCallback((event) => {
+        switch (event.type) {
+            case 'snapshot':
+                setTables(event.tables)
+                setQueue(ordered(event.queue))
+                setLoading(false)
+                setError(null)
+                break
+            case 'table_updated':
+                setTables(prev => upsertById(prev, event.table))
+                break
+            case 'queue_updated':
+                setQueue(prev => ordered(upsertById(prev, event.entry)))
+                break
+            case 'queue_removed':
+                setQueue(prev => ordered(prev.filter(e => e.id !== event.id)))
+                break
+            case 'queue_patch': {
+                const patches = new Map(event.entries.map(p => [p.id, p]))
+                setQueue(prev => prev
+                    .map(e => (patches.has(e.id) ? { ...e, ...patches.get(e.id) } : e)))
+                break
+            }
+            default:
+                break
+        }
+    }, [])
+
+    useEffect(() => {
+        let socket = null
+        let retryTimer = null
+        let connectTimer = null
+        let retryDelay = 1000
+        let stopped = false
+
+        const connect = () => {
+            socket = new WebSocket(FEED_URL)
+            connectTimer = setTimeout(() => {
+                setError('Could not connect to the live feed')
+                socket.close()
+            }, CONNECT_TIMEOUT)
+            socket.onopen = () => {
+                clearTimeout(connectTimer)
+                setConnected(true)
+                retryDelay = 1000
+            }
+            socket.onmessage = (message) => applyEvent(JSON.parse(message.data))
+            socket.onerror = () => setError('Could not connect to the live feed')
+            socket.onclose = () => {
+                clearTimeout(connectTimer)
+                setConnected(false)
+                if (stopped) return
+                setError(prev => prev || 'Connection to the live feed was lost')
+                retryTimer = setTimeout(connect, retryDelay)
+                retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY)
+            }
+        }
+
+        setError(null)
+        connect()
+        return () => {
+            stopped = true
+            clearTimeout(retryTimer)
+            clearTimeout(connectTimer)
+            if (socket) socket.close()
+        }
+    }, [applyEvent, generation])
+
+    // Drop the socket and start over with a fresh snapshot
+    const reconnect = useCallback(() => setGeneration(g => g + 1), [])
+
+    return { tables, queue, loading, connected, error, reconnect }
+}
+
+export default useFloorFeed
@@ -1,60 +1,22 @@
 import { Link } from 'react-router-dom'
-import { useState, useEffect } from 'react'
-
-const API_BASE = 'http://localhost:8000'
+import useFloorFeed from '../hooks/useFloorFeed'
 
 function Dashboard() {
-    const [tables, setTables] = useState([])
-    const [queue, setQueue] = useState([])
-    const [loading, setLoading] = useState(true)
-    const [error, setError] = useState(null)
-
-    const fetchData = async () => {
-        try {
-            setLoading(true)
-            const [tablesRes, queueRes] = await Promise.all([
-                fetch(`${API_BASE}/api/tables`),
-                fetch(`${API_BASE}/api/queue`)
-            ])
-
-            if (!tablesRes.ok || !queueRes.ok) {
-                throw new Error('Failed to fetch data')
-            }
-
-            const tablesData = await tablesRes.json()
-            const queueData = await queueRes.json()
-
-            setTables(tablesData)
-            setQueue(queueData)
-            setError(null)
-        } catch (err) {
-            setError(err.message)
-            console.error('Error fetching data:', err)
-        } finally {
-            setLoading(false)
-        }
-    }
-
-    useEffect(() => {
-        fetchData()
-        // Refresh data every 5 seconds
-        const interval = setInterval(fetchData, 5000)
-        return () => clearInterval(interval)
-    }, [])
+    const { tables, queue, loading, connected, error, reconnect } = useFloorFeed()
 
-    if (loading && tables.length === 0) {
+    if (error && tables.length === 0) {
         return (
-            <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh' }}>
-                <div style={{ color: 'var(--text-secondary)' }}>Loading...</div>
+            <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh', flexDirection: 'column', gap: '1rem' }}>
+                <div style={{ color: 'var(--danger)' }}>Error: {error}</div>
+                <button className="btn" onClick={reconnect}>Retry</button>
             </div>
         )
     }
 
-    if (error) {
+    if (loading && tables.length === 0) {
         return (
-            <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh', flexDirection: 'column', gap: '1rem' }}>
-                <div style={{ color: 'var(--danger)' }}>Error: {error}</div>
-                <button className="btn" onClick={fetchData}>Retry</button>
+            <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh' }}>
+                <div style={{ color: 'var(--text-secondary)' }}>Loading...</div>
             </div>
         )
     }
@@ -75,8 +37,8 @@ function Dashboard() {
                         <h1 className="title-gradient" style={{ margin: 0, fontSize: '1.5rem' }}>Antigravity Restaurant</h1>
                     </Link>
                     <nav style={{ display: 'flex', gap: '1rem', alignItems: 'center' }}>
-                        <button className="btn btn-outline" onClick={fetchData} style={{ padding: '0.5rem 1rem' }}>
-                            🔄 Refresh
+                        <button className="btn btn-outline" onClick={reconnect} style={{ padding: '0.5rem 1rem' }}>
+                            {connected ? '🟢 Live' : '🔄 Reconnect'}
                         </button>
                         <Link to="/dashboard" className="btn">Dashboard</Link>
                         <Link to="/staff" className="btn btn-outline">Staff Login</Link>
@@ -87,6 +49,13 @@ function Dashboard() {
             <main className="container" style={{ padding: '2rem 1rem' }}>
                 <h2 style={{ fontSize: '2rem', marginBottom: '2rem' }}>Customer Dashboard</h2>
 
+                {error && (
+                    <div className="card" style={{ color: 'var(--danger)', marginBottom: '2rem', display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+                        <span>{error} - showing the last known state</span>
+                        <button className="btn" onClick={reconnect}>Retry</button>
+                    </div>
+                )}
+
                 {/* Table Grid */}
                 <section style={{ marginBottom: '3rem' }}>
                     <h3 style={{ marginBottom: '1rem' }}>Table Availability (Live)</h3>
@@ -1,31 +1,13 @@
 import { Link } from 'react-router-dom'
-import { useState, useEffect } from 'react'
+import { useState } from 'react'
+import useFloorFeed from '../hooks/useFloorFeed'
 
 const API_BASE = 'http://localhost:8000'
 
 function StaffPanel() {
-    const [tables, setTables] = useState([])
-    const [loading, setLoading] = useState(true)
+    const { tables, loading, error, reconnect } = useFloorFeed()
     const [updating, setUpdating] = useState(null)
 
-    const fetchTables = async () => {
-        try {
-            const res = await fetch(`${API_BASE}/api/tables`)
-            const data = await res.json()
-            setTables(data)
-            setLoading(false)
-        } catch (err) {
-            console.error('Error fetching tables:', err)
-        }
-    }
-
-    useEffect(() => {
-        fetchTables()
-        // Refresh every 3 seconds
-        const interval = setInterval(fetchTables, 3000)
-        return () => clearInterval(interval)
-    }, [])
-
     const updateTableStatus = async (tableId, newStatus) => {
         setUpdating(tableId)
         try {
@@ -35,13 +17,11 @@ function StaffPanel() {
                 body: JSON.stringify({ status: newStatus })
             })
 
-            if (res.ok) {
-                // Fetch updated data
-                await fetchTables()
-
-                // Trigger agent orchestration
-                await fetch(`${API_BASE}/api/agents/run`, { method: 'POST' })
+            if (!res.ok) {
+                console.error('Error updating table:', res.status)
             }
+            // The new status arrives over the floor feed; agents run on the
+            // server after every update
         } catch (err) {
             console.error('Error updating table:', err)
         } finally {
@@ -49,7 +29,16 @@ function StaffPanel() {
         }
     }
 
-    if (loading) {
+    if (error && tables.length === 0) {
+        return (
+            <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh', flexDirection: 'column', gap: '1rem' }}>
+                <div style={{ color: 'var(--danger)' }}>Error: {error}</div>
+                <button className="btn" onClick={reconnect}>Retry</button>
+            </div>
+        )
+    }
+
+    if (loading && tables.length === 0) {
         return <div style={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh' }}>Loading...</div>
     }
 
@@ -80,6 +69,13 @@ function StaffPanel() {
                     </div>
                 </div>
 
+                {error && (
+                    <div className="card" style={{ color: 'var(--danger)', marginBottom: '2rem', display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+                        <span>{error} - showing the last known state</span>
+                        <button className="btn" onClick={reconnect}>Retry</button>
+                    </div>
+                )}
+
                 <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(250px, 1fr))', gap: '1.5rem' }}>
                     {tables.map(table => (
                         <div key={table.id} className="card" style={{ opacity: updating === table.id ? 0.6 : 1 }}>
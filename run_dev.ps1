@@ -1,4 +1,4 @@
-$backend = Start-Process -FilePath "powershell" -ArgumentList "cd backend; .\venv\Scripts\python -m uvicorn main:app --reload --port 8000" -PassThru
+$backend = Start-Process -FilePath "powershell" -ArgumentList "cd backend; .\venv\Scripts\python -m database.migrations migrate --seed; .\venv\Scripts\python -m uvicorn main:app --reload --port 8000" -PassThru
 $frontend = Start-Process -FilePath "powershell" -ArgumentList "cd frontend; npm run dev" -PassThru
 
 Write-Host "Started Backend (PID: $($backend.Id)) and Frontend (PID: $($frontend.Id))"